@@ -36,6 +36,13 @@ class WorkerConfig(BaseSettings):
     llm_base_url: str = os.getenv("LLM_BASE_URL", "http://localhost:11434").rstrip("/")
     llm_provider: str = os.getenv("LLM_PROVIDER", "ollama")  # informational label
     llm_reasoning_effort: str = os.getenv("LLM_REASONING_EFFORT", "none")
+    # SQLite file persisting parsed LLM responses across runs (empty = in-memory only)
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "")
+    # Smaller model on the same server for short symbols (empty = use llm_model)
+    llm_small_model: str = os.getenv("LLM_SMALL_MODEL", "")
+    # Ollama only: call native /api/chat so keep_alive pins the model in memory
+    llm_ollama_native: bool = os.getenv("LLM_OLLAMA_NATIVE", "false").lower() == "true"
+    llm_keep_alive: str = os.getenv("LLM_KEEP_ALIVE", "30m")
 
     # Incremental Update Configuration
     enable_incremental_updates: bool = os.getenv("ENABLE_INCREMENTAL_UPDATES", "false").lower() == "true"
@@ -78,6 +78,42 @@ class LocalEmbeddingGenerator:
             logger.error(f"Error generating embedding: {e}")
             return [0.0] * config.embedding_dimensions
 
+    def generate_text_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int = 64
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts in one batched encode call
+
+        Args:
+            texts: Input texts
+            batch_size: Number of texts per forward pass
+
+        Returns:
+            List of embedding vectors, in the same order as texts
+        """
+        if not texts:
+            return []
+
+        try:
+            # Add task instruction prefix for document embedding
+            prefixed = [f"search_document: {text}" for text in texts]
+
+            embeddings = self.model.encode(
+                prefixed,
+                convert_to_tensor=False,
+                show_progress_bar=False,
+                batch_size=batch_size,
+                normalize_embeddings=True  # Normalize for dot_product similarity
+            )
+
+            return [embedding.tolist() for embedding in embeddings]
+        except Exception as e:
+            # Embed one by one so only the texts that actually fail get zero vectors
+            logger.error(f"Error generating batch embeddings, retrying individually: {e}")
+            return [self.generate_embedding(text) for text in texts]
+
     def prepare_text_for_embedding(
         self,
         chunk: Union[CodeChunk, DocumentChunk, CommitChunk]
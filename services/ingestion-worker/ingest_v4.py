@@ -24,27 +24,71 @@ import sys
 import asyncio
 import argparse
 import json
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 
 from loguru import logger
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import WorkerConfig
 from v4.pipeline import V4Pipeline
+from v4.schemas import SCHEMA_VERSION
 from llm_enricher import LLM_CONFIG
 
 config = WorkerConfig()
 
 
+_ORIGIN_SECTION_RE = re.compile(r'^\[remote "origin"\]([^\[]*)', re.MULTILINE)
+_URL_LINE_RE = re.compile(r'^\s*url\s*=\s*(\S+)', re.MULTILINE)
+
+
+def repo_id_from_origin(repo_path: str) -> Optional[str]:
+    """
+    Read owner/name from the origin URL in .git/config.
+
+    Plain file read, no git subprocess. Handles https (with or without an
+    embedded token) and scp-style ssh URLs. Returns None if the repo has no
+    readable origin.
+    """
+    try:
+        with open(os.path.join(repo_path, '.git', 'config'), encoding='utf-8') as f:
+            git_config = f.read()
+    except OSError:
+        return None
+
+    section = _ORIGIN_SECTION_RE.search(git_config)
+    if not section:
+        return None
+    url_match = _URL_LINE_RE.search(section.group(1))
+    if not url_match:
+        return None
+
+    url = url_match.group(1).rstrip('/')
+    if url.endswith('.git'):
+        url = url[:-4]
+    parts = re.split(r'[/:]', url)
+    if len(parts) < 2 or not parts[-2] or not parts[-1]:
+        return None
+    return f"{parts[-2]}/{parts[-1]}"
+
+
 def discover_repositories() -> List[Dict[str, str]]:
     """
     Discover all repositories in the repos path.
 
-    Repository folders are named owner_repo (e.g., kbhalerao_labcore).
+    Repository folders are named owner_repo (e.g., kbhalerao_labcore). The
+    repo_id comes from the origin URL when available, since splitting the
+    folder name on '_' is ambiguous for owners or names containing '_'.
 
     Returns:
         List of dicts with repo_id and repo_path
@@ -56,31 +100,36 @@ def discover_repositories() -> List[Dict[str, str]]:
 
     repositories = []
 
-    for repo_dir in repos_path.iterdir():
-        if not repo_dir.is_dir():
-            continue
-
-        # Skip hidden directories
-        if repo_dir.name.startswith('.'):
-            continue
-
-        # Convert folder name back to repo_id
-        # Folder: owner_repo -> Repo ID: owner/repo
-        parts = repo_dir.name.split('_', 1)
-        if len(parts) == 2:
-            repo_id = f"{parts[0]}/{parts[1]}"
-        else:
-            repo_id = repo_dir.name
-
-        # Verify it's a git repo
-        if not (repo_dir / '.git').exists():
-            logger.warning(f"Skipping non-git directory: {repo_dir.name}")
-            continue
-
-        repositories.append({
-            "repo_id": repo_id,
-            "repo_path": str(repo_dir),
-        })
+    # scandir's DirEntry.is_dir() uses the d_type from readdir, so only the
+    # .git check costs a stat per candidate
+    with os.scandir(repos_path) as entries:
+        for entry in entries:
+            # Skip hidden directories
+            if entry.name.startswith('.'):
+                continue
+
+            if not entry.is_dir():
+                continue
+
+            # Verify it's a git repo
+            if not os.path.exists(os.path.join(entry.path, '.git')):
+                logger.warning(f"Skipping non-git directory: {entry.name}")
+                continue
+
+            repo_id = repo_id_from_origin(entry.path)
+            if not repo_id:
+                # Convert folder name back to repo_id
+                # Folder: owner_repo -> Repo ID: owner/repo
+                parts = entry.name.split('_', 1)
+                if len(parts) == 2:
+                    repo_id = f"{parts[0]}/{parts[1]}"
+                else:
+                    repo_id = entry.name
+
+            repositories.append({
+                "repo_id": repo_id,
+                "repo_path": entry.path,
+            })
 
     logger.info(f"Discovered {len(repositories)} repositories in {repos_path}")
     return repositories
@@ -89,15 +138,23 @@ def discover_repositories() -> List[Dict[str, str]]:
 def check_document_exists(storage, repo_id: str) -> bool:
     """Check if any V4 documents exist for this repo."""
     try:
+        from couchbase.options import QueryOptions
         query = f"""
             SELECT META().id
             FROM `{config.couchbase_bucket}`
             WHERE repo_id = $repo_id
             AND type IN ['repo_summary', 'module_summary', 'file_index', 'symbol_index']
-            AND version.schema_version = 'v4.0'
+            AND version.schema_version = $schema_version
             LIMIT 1
         """
-        result = storage.cluster.query(query, repo_id=repo_id)
+        # adhoc=False lets the query service reuse the prepared plan across repos
+        result = storage.cluster.query(
+            query,
+            QueryOptions(
+                named_parameters={"repo_id": repo_id, "schema_version": SCHEMA_VERSION},
+                adhoc=False,
+            )
+        )
         rows = list(result)
         return len(rows) > 0
     except Exception as e:
@@ -105,13 +162,53 @@ def check_document_exists(storage, repo_id: str) -> bool:
         return False
 
 
+def get_existing_repo_ids(storage, repo_ids: List[str]) -> Set[str]:
+    """
+    Return the subset of repo_ids that already have V4 documents.
+
+    One grouped query for the whole --all run instead of one
+    check_document_exists round-trip per repository.
+    """
+    if not repo_ids:
+        return set()
+
+    try:
+        from couchbase.options import QueryOptions
+        query = f"""
+            SELECT d.repo_id
+            FROM `{config.couchbase_bucket}` d
+            WHERE d.repo_id IN $repo_ids
+            AND d.type IN ['repo_summary', 'module_summary', 'file_index', 'symbol_index']
+            AND d.version.schema_version = $schema_version
+            GROUP BY d.repo_id
+        """
+        result = storage.cluster.query(
+            query,
+            QueryOptions(
+                named_parameters={"repo_ids": repo_ids, "schema_version": SCHEMA_VERSION},
+                adhoc=False,
+            )
+        )
+        return {row["repo_id"] for row in result}
+    except Exception as e:
+        logger.debug(f"Error checking existing docs: {e}")
+        return set()
+
+
 async def ingest_repository(
     pipeline: V4Pipeline,
     repo_path: str,
     repo_id: str,
     skip_existing: bool = False,
+    file_concurrency: int = 4,
+    existing_repo_ids: Optional[Set[str]] = None,
 ) -> Dict:
-    """Ingest a single repository."""
+    """
+    Ingest a single repository.
+
+    existing_repo_ids, when given, is a precomputed result of
+    get_existing_repo_ids() used for skip_existing instead of a per-repo query.
+    """
     logger.info(f"\n{'='*60}")
     logger.info(f"Processing: {repo_id}")
     logger.info(f"Path: {repo_path}")
@@ -119,7 +216,11 @@ async def ingest_repository(
 
     # Check if should skip
     if skip_existing and pipeline.storage:
-        if check_document_exists(pipeline.storage, repo_id):
+        if existing_repo_ids is not None:
+            exists = repo_id in existing_repo_ids
+        else:
+            exists = check_document_exists(pipeline.storage, repo_id)
+        if exists:
             logger.info(f"Skipping {repo_id} - V4 documents already exist")
             return {"repo_id": repo_id, "status": "skipped"}
 
@@ -128,6 +229,7 @@ async def ingest_repository(
             repo_path=Path(repo_path),
             repo_id=repo_id,
             delete_existing=True,
+            file_concurrency=file_concurrency,
         )
         result["status"] = "success"
         return result
@@ -229,6 +331,7 @@ async def main():
                 repo_path=str(repo_path),
                 repo_id=args.repo,
                 skip_existing=args.skip_existing,
+                file_concurrency=args.concurrency,
             )
             results.append(result)
 
@@ -243,9 +346,17 @@ async def main():
             logger.info(f"\nWill process {len(repositories)} repositories")
             logger.info(f"LLM: {'enabled' if not args.no_llm else 'disabled'}")
             logger.info(f"Embeddings: {'enabled' if not args.no_embeddings else 'disabled'}")
+            logger.info(f"File concurrency: {args.concurrency}")
             logger.info(f"Dry run: {args.dry_run}")
             logger.info("")
 
+            existing_repo_ids = None
+            if args.skip_existing and pipeline.storage:
+                existing_repo_ids = get_existing_repo_ids(
+                    pipeline.storage, [r['repo_id'] for r in repositories]
+                )
+                logger.info(f"{len(existing_repo_ids)} repositories already have V4 documents")
+
             for i, repo in enumerate(repositories, 1):
                 logger.info(f"\n[{i}/{len(repositories)}] {repo['repo_id']}")
 
@@ -254,6 +365,8 @@ async def main():
                     repo_path=repo['repo_path'],
                     repo_id=repo['repo_id'],
                     skip_existing=args.skip_existing,
+                    file_concurrency=args.concurrency,
+                    existing_repo_ids=existing_repo_ids,
                 )
                 results.append(result)
 
@@ -298,8 +411,16 @@ async def main():
             },
             "results": results,
         }
-        with open(args.output, 'w') as f:
-            json.dump(output_data, f, indent=2, default=str)
+        if HAS_ORJSON:
+            with open(args.output, 'wb') as f:
+                f.write(orjson.dumps(
+                    output_data,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                ))
+        else:
+            with open(args.output, 'w') as f:
+                json.dump(output_data, f, indent=2, default=str)
         print(f"\nResults saved to: {args.output}")
 
 
@@ -0,0 +1,321 @@
+"""
+LLM Response Cache
+
+Exact-match cache for LLM calls. Keys are SHA-256 digests of everything that
+determines the response (model + prompt), values are the caller's parsed
+result, so response parsing runs once per unique prompt.
+
+An optional SQLite file adds a persistent tier, so re-ingesting unchanged
+files skips the LLM across runs.
+
+SemanticCache covers near-duplicates: values are keyed by a normalized
+embedding and returned when a new embedding is close enough.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Payloads above this size are stored zlib-compressed behind a marker that
+# can't start a JSON document; smaller ones are stored as plain JSON.
+_COMPRESS_MIN_BYTES = 1024
+_ZLIB_MARKER = b"zlib:"
+
+
+def _dumps(value: Any) -> bytes:
+    payload = orjson.dumps(value) if HAS_ORJSON else json.dumps(value).encode("utf-8")
+    if len(payload) >= _COMPRESS_MIN_BYTES:
+        payload = _ZLIB_MARKER + zlib.compress(payload, 6)
+    return payload
+
+
+def _loads(payload: bytes) -> Any:
+    if payload.startswith(_ZLIB_MARKER):
+        payload = zlib.decompress(payload[len(_ZLIB_MARKER):])
+    if HAS_ORJSON:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# Writes are buffered and committed this many at a time, one transaction each
+_WRITE_BATCH = 32
+
+
+def _flush_pending(conn: sqlite3.Connection, lock: threading.Lock, insert_sql: str, pending: list) -> None:
+    with lock:
+        if not pending:
+            return
+        rows = pending[:]
+        pending.clear()
+        try:
+            conn.execute("BEGIN")
+            conn.executemany(insert_sql, rows)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed, {len(rows)} entries dropped: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+
+
+def _flush_and_close(conn: sqlite3.Connection, lock: threading.Lock, insert_sql: str, pending: list) -> None:
+    _flush_pending(conn, lock, insert_sql, pending)
+    with lock:
+        conn.close()
+
+
+class _SQLiteStore:
+    """
+    SQLite file behind a cache tier.
+
+    WAL with synchronous=NORMAL lets readers proceed while a write is in
+    progress and defers fsync to checkpoints. Inserts are buffered and
+    committed in batches of _WRITE_BATCH with executemany; anything still
+    buffered is written on close(), or at garbage collection / interpreter
+    exit if the owner never closes.
+    """
+
+    def __init__(self, path: str, schema_sql: str, insert_sql: str):
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(schema_sql)
+        self._lock = threading.Lock()
+        self._insert_sql = insert_sql
+        self._pending: list = []
+        self._finalizer = weakref.finalize(
+            self, _flush_and_close, self._conn, self._lock, insert_sql, self._pending
+        )
+
+    def query(self, sql: str, params: tuple) -> list:
+        """Run a SELECT. Buffered inserts aren't visible until flushed."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def insert(self, params: tuple) -> None:
+        """Queue a row for insert_sql, flushing when the batch is full."""
+        with self._lock:
+            self._pending.append(params)
+            full = len(self._pending) >= _WRITE_BATCH
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit buffered inserts."""
+        _flush_pending(self._conn, self._lock, self._insert_sql, self._pending)
+
+    def close(self) -> None:
+        """Flush and close the connection."""
+        self._finalizer()
+
+
+class PromptCache:
+    """
+    LRU cache of parsed LLM responses keyed by prompt hash, optionally
+    backed by a SQLite file. Values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 2048, path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Entries kept in memory before the least recently used is evicted
+            path: SQLite file for the persistent tier (None = memory only)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Entries not yet flushed to SQLite are always still in memory, as
+        # long as max_entries exceeds the write batch
+        self._db: Optional[_SQLiteStore] = None
+        if path:
+            try:
+                self._db = _SQLiteStore(
+                    path,
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, payload BLOB NOT NULL)",
+                    "INSERT OR REPLACE INTO responses (key, payload) VALUES (?, ?)",
+                )
+                logger.info(f"LLM response cache: {path}")
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open LLM response cache {path}, using memory only: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key from the strings that determine the response."""
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(part.encode("utf-8", errors="surrogatepass"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self._db is not None:
+            try:
+                rows = self._db.query("SELECT payload FROM responses WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache read failed: {e}")
+                rows = []
+            if rows:
+                value = _loads(rows[0][0])
+                self._remember(key, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key, evicting the oldest in-memory entry when full."""
+        self._remember(key, value)
+        if self._db is not None:
+            self._db.insert((key, _dumps(value)))
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self) -> None:
+        """Flush and close the SQLite tier, if any."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of JSON-serializable values keyed by embedding.
+
+    Vectors are L2-normalized float32, so cosine similarity is a single
+    matrix-vector product over everything stored. Entries are scoped by
+    namespace (e.g. model + task) so unrelated prompts never match.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        path: Optional[str] = None,
+        namespace: str = "",
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit. Kept high: near
+                0.90 different code starts matching.
+            path: SQLite file for the persistent tier (None = memory only)
+            namespace: Scope for stored entries
+        """
+        self.threshold = threshold
+        self.namespace = namespace
+        # Rows [0, len(self._values)) of _vectors are live; capacity doubles
+        # on demand so inserts stay amortized O(1)
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self.hits = 0
+        self.misses = 0
+
+        self._db: Optional[_SQLiteStore] = None
+        if path:
+            try:
+                self._db = _SQLiteStore(
+                    path,
+                    "CREATE TABLE IF NOT EXISTS semantic_responses "
+                    "(namespace TEXT NOT NULL, vector BLOB NOT NULL, payload BLOB NOT NULL)",
+                    "INSERT INTO semantic_responses (namespace, vector, payload) VALUES (?, ?, ?)",
+                )
+                rows = self._db.query(
+                    "SELECT vector, payload FROM semantic_responses WHERE namespace = ?",
+                    (namespace,),
+                )
+                for vector, payload in rows:
+                    vector = np.frombuffer(vector, dtype=np.float32)
+                    if self._vectors is None or vector.shape[0] == self._vectors.shape[1]:
+                        self._append(vector, _loads(payload))
+                logger.info(f"Semantic LLM cache: {path} ({len(rows)} entries)")
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open semantic LLM cache {path}, using memory only: {e}")
+                self._db = None
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            # Embedders return zero vectors on failure; never match those
+            return None
+        return vector / norm
+
+    def get(self, embedding: Sequence[float]) -> Optional[Any]:
+        """Return the value of the most similar entry at or above threshold, or None."""
+        vector = self._normalize(embedding)
+        if vector is None or self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+            self.misses += 1
+            return None
+
+        scores = self._vectors[:len(self._values)] @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            self.hits += 1
+            return self._values[best]
+        self.misses += 1
+        return None
+
+    def put(self, embedding: Sequence[float], value: Any) -> None:
+        """Store value under embedding."""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        if self._vectors is not None and vector.shape[0] != self._vectors.shape[1]:
+            logger.warning("Semantic LLM cache: embedding dimension changed, entry not stored")
+            return
+        self._append(vector, value)
+        if self._db is not None:
+            self._db.insert((self.namespace, vector.tobytes(), _dumps(value)))
+
+    def _append(self, vector: np.ndarray, value: Any) -> None:
+        size = len(self._values)
+        if self._vectors is None:
+            self._vectors = np.empty((64, vector.shape[0]), dtype=np.float32)
+        elif size == self._vectors.shape[0]:
+            grown = np.empty((size * 2, self._vectors.shape[1]), dtype=np.float32)
+            grown[:size] = self._vectors
+            self._vectors = grown
+        self._vectors[size] = vector
+        self._values.append(value)
+
+    def close(self) -> None:
+        """Flush and close the SQLite tier, if any."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -15,19 +15,47 @@ import asyncio
 import json
 import re
 import hashlib
+import os
+import threading
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from string import Formatter
+from typing import Optional, List, Dict, Any, AsyncIterator, Sequence
 from pathlib import Path
 
 import httpx
 from loguru import logger
 
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from config import WorkerConfig
+from llm_cache import PromptCache
 
 config = WorkerConfig()
 
+# Characters of file content included in a pass prompt
+MAX_PROMPT_CHARS = 15000
 
-@dataclass
+# File extension -> language for enrich_repository
+LANGUAGE_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".sql": "sql",
+    ".svelte": "svelte"
+}
+
+
+@dataclass(slots=True)
 class SemanticChunk:
     """A chunk identified by LLM analysis"""
     chunk_type: str  # embedded_sql, business_logic, api_endpoint, data_transform, etc.
@@ -49,6 +77,24 @@ class EnrichmentPass:
     prompt_template: str
     min_file_size: int = 500  # Only analyze files larger than this
     languages: List[str] = field(default_factory=list)  # Empty = all languages
+    precheck: Optional[re.Pattern] = None  # Skip files with no match; None = always run
+    # (literal, field_name) pairs parsed from prompt_template once
+    _segments: tuple = field(init=False, repr=False, default=())
+
+    def __post_init__(self):
+        self._segments = tuple(
+            (literal, field_name)
+            for literal, field_name, _, _ in Formatter().parse(self.prompt_template)
+        )
+
+    def render(self, **values: str) -> str:
+        """Fill the prompt template; equivalent to prompt_template.format(**values)."""
+        parts = []
+        for literal, field_name in self._segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(values[field_name])
+        return "".join(parts)
 
 
 # Enrichment pass configurations
@@ -97,7 +143,12 @@ Respond with JSON array of found items:
 ```
 
 Return empty array [] if no embedded code found. Only include items with confidence > 0.7.""",
-        languages=["python", "javascript", "typescript"]
+        languages=["python", "javascript", "typescript"],
+        precheck=re.compile(
+            r"select|insert|update|delete|create|<[a-z!/]|mutation|query|gql|"
+            r"subprocess|os\.system|exec|shell|bash|re\.|regexp|\$\(|schema|`",
+            re.IGNORECASE,
+        ),
     ),
 
     EnrichmentPass(
@@ -191,22 +242,133 @@ Respond with JSON array:
 ```
 
 Return empty array [] if no API patterns found.""",
-        languages=["python", "javascript", "typescript"]
+        languages=["python", "javascript", "typescript"],
+        precheck=re.compile(
+            r"route|endpoint|urlpattern|path\(|@app|@api|\.(get|post|put|patch|delete)\(|"
+            r"view|request|response|schema|serializ|graphql|resolver|socket|rpc|"
+            r"middleware|http|fastapi|flask|django|express|basemodel",
+            re.IGNORECASE,
+        ),
     ),
 ]
 
 
+# Markdown code fence around a JSON answer, and backslashes that aren't
+# valid JSON escapes (both only needed when bare parsing fails)
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)\s*```')
+_INVALID_ESCAPE_RE = re.compile(r'\\(?!["\\/bfnrtu])')
+
+
+def _json_loads(text: str) -> Any:
+    """json.loads, via orjson when available (its errors subclass JSONDecodeError)."""
+    if HAS_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Patterns that suggest code embedded in strings, compiled once at import.
+# Each is searched separately: a fused alternation would let one match
+# (e.g. a docstring) consume text another pattern needs (SQL inside it).
+_EMBEDDED_SOURCES = [
+    (r'"""[\s\S]{200,}?"""', "long_docstring_or_sql"),  # Long triple-quoted strings
+    (r"f'''[\s\S]{100,}?'''", "f_string_multiline"),
+    (r'f"[^"]{100,}"', "long_f_string"),
+    (r'SELECT\s+.+FROM', "embedded_sql"),
+    (r'INSERT\s+INTO', "embedded_sql"),
+    (r'UPDATE\s+.+SET', "embedded_sql"),
+    (r'DELETE\s+FROM', "embedded_sql"),
+    (r'CREATE\s+TABLE', "embedded_sql"),
+    (r'<[a-z]+[^>]*>[\s\S]{50,}?</[a-z]+>', "embedded_html"),
+    (r'mutation\s*\{', "embedded_graphql"),
+    (r'query\s*\{', "embedded_graphql"),
+]
+_EMBEDDED_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), name) for pattern, name in _EMBEDDED_SOURCES
+]
+
+# Hyperscan matches the whole embedded-pattern set in one pass. It counts
+# repeats in bytes, so it is only used for ASCII content where that agrees
+# with re. Databases are built lazily per thread, since a database's
+# scratch space can't be shared between concurrent scans.
+_hyperscan_local = threading.local()
+_hyperscan_failed = False
+
+
+def _get_hyperscan_db():
+    """Return this thread's compiled hyperscan database, or None if unavailable."""
+    global _hyperscan_failed
+    if not HAS_HYPERSCAN or _hyperscan_failed:
+        return None
+
+    db = getattr(_hyperscan_local, "db", None)
+    if db is None:
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[pattern.encode() for pattern, _ in _EMBEDDED_SOURCES],
+                ids=list(range(len(_EMBEDDED_SOURCES))),
+                flags=[flags] * len(_EMBEDDED_SOURCES),
+            )
+        except Exception as e:
+            logger.warning(f"Hyperscan compile failed, using re for embedded patterns: {e}")
+            _hyperscan_failed = True
+            return None
+        _hyperscan_local.db = db
+    return db
+
+
+def _find_embedded_patterns(content: str) -> List[str]:
+    """Names of embedded-code patterns found in content, in pattern order."""
+    db = _get_hyperscan_db() if content.isascii() else None
+    if db is None:
+        return [name for pattern, name in _EMBEDDED_PATTERNS if pattern.search(content)]
+
+    matched = set()
+
+    def on_match(pattern_id, start, end, flags, context):
+        matched.add(pattern_id)
+
+    db.scan(content.encode("ascii"), match_event_handler=on_match)
+    return [_EMBEDDED_SOURCES[i][1] for i in sorted(matched)]
+
+
+_SQL_EXECUTION_RE = re.compile(r'\.execute\s*\(|\.query\s*\(|cursor\.|rawsql|text\s*\(', re.IGNORECASE)
+_STRING_FORMAT_RE = re.compile(r'\.format\s*\(|%\s*\(|f["\']')
+_TEMPLATE_LITERAL_RE = re.compile(r'`[^`]*\$\{[^}]+\}[^`]*`')
+
+
 def is_underchunked(file_path: str, content: str, chunks: List[Dict], language: str) -> tuple[bool, str]:
     """
     Detect if a file is inadequately chunked and needs LLM analysis.
 
+    Compatibility wrapper over is_underchunked_names() for callers holding
+    chunk dicts.
+
+    Returns:
+        (needs_enrichment: bool, reason: str)
+    """
+    return is_underchunked_names(
+        file_path, content, [c.get("symbol_name", "") for c in chunks], language
+    )
+
+
+def is_underchunked_names(
+    file_path: str, content: str, names: Sequence[str], language: str
+) -> tuple[bool, str]:
+    """
+    Detect if a file is inadequately chunked and needs LLM analysis.
+
+    Takes the symbol names found by structural parsing directly, so callers
+    don't have to build a dict per symbol.
+
     Returns:
         (needs_enrichment: bool, reason: str)
     """
     reasons = []
 
     file_size = len(content)
-    chunk_count = len(chunks)
+    chunk_count = len(names)
     lines = content.count('\n') + 1
 
     # 1. Large file with few chunks (suspicious)
@@ -220,39 +382,23 @@ def is_underchunked(file_path: str, content: str, chunks: List[Dict], language:
             reasons.append(f"high_density ({lines_per_chunk:.0f} lines/chunk)")
 
     # 3. Contains patterns that suggest embedded code
-    embedded_patterns = [
-        (r'"""[\s\S]{200,}?"""', "long_docstring_or_sql"),  # Long triple-quoted strings
-        (r"f'''[\s\S]{100,}?'''", "f_string_multiline"),
-        (r'f"[^"]{100,}"', "long_f_string"),
-        (r'SELECT\s+.+FROM', "embedded_sql"),
-        (r'INSERT\s+INTO', "embedded_sql"),
-        (r'UPDATE\s+.+SET', "embedded_sql"),
-        (r'DELETE\s+FROM', "embedded_sql"),
-        (r'CREATE\s+TABLE', "embedded_sql"),
-        (r'<[a-z]+[^>]*>[\s\S]{50,}?</[a-z]+>', "embedded_html"),
-        (r'mutation\s*\{', "embedded_graphql"),
-        (r'query\s*\{', "embedded_graphql"),
-    ]
-
-    for pattern, name in embedded_patterns:
-        if re.search(pattern, content, re.IGNORECASE):
-            reasons.append(name)
+    reasons.extend(_find_embedded_patterns(content))
 
     # 4. Language-specific checks
     if language == "python":
         # Check for SQL-building patterns
-        if re.search(r'\.execute\s*\(|\.query\s*\(|cursor\.|rawsql|text\s*\(', content, re.IGNORECASE):
+        if _SQL_EXECUTION_RE.search(content):
             if "embedded_sql" not in reasons:
                 reasons.append("sql_execution_pattern")
 
         # Check for complex string formatting
-        format_count = len(re.findall(r'\.format\s*\(|%\s*\(|f["\']', content))
+        format_count = sum(1 for _ in _STRING_FORMAT_RE.finditer(content))
         if format_count > 5:
             reasons.append(f"heavy_string_formatting ({format_count} instances)")
 
     if language == "javascript" or language == "typescript":
         # Template literals with expressions
-        template_literals = len(re.findall(r'`[^`]*\$\{[^}]+\}[^`]*`', content))
+        template_literals = sum(1 for _ in _TEMPLATE_LITERAL_RE.finditer(content))
         if template_literals > 3:
             reasons.append(f"template_literals ({template_literals} instances)")
 
@@ -270,6 +416,60 @@ def is_underchunked(file_path: str, content: str, chunks: List[Dict], language:
     return needs_enrichment, "; ".join(reasons) if reasons else "adequately_chunked"
 
 
+def _applicable_passes(
+    content: str, language: str, passes: Optional[List[EnrichmentPass]]
+) -> List[EnrichmentPass]:
+    """Passes worth running on a file."""
+    return [
+        pass_config for pass_config in (ENRICHMENT_PASSES if passes is None else passes)
+        # Skip passes that don't apply to this language, small files, and
+        # files without any of the pass's seed tokens
+        if (not pass_config.languages or language in pass_config.languages)
+        and len(content) >= pass_config.min_file_size
+        and (pass_config.precheck is None or pass_config.precheck.search(content))
+    ]
+
+
+def _detect_language(file_path: str) -> str:
+    """Language for a file path, from its extension."""
+    return LANGUAGE_MAP.get(os.path.splitext(file_path)[1], "unknown")
+
+
+def _underchunked_head(
+    full_path: Path, file_path: str, names: Sequence[str], language: str
+) -> Optional[str]:
+    """
+    Read a file and run is_underchunked_names() on it.
+
+    Returns:
+        The first MAX_PROMPT_CHARS characters (what the prompts see) if the
+        file needs enrichment, else None
+    """
+    try:
+        with open(full_path, encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except OSError:
+        return None
+    needs_enrichment, _ = is_underchunked_names(file_path, content, names, language)
+    return content[:MAX_PROMPT_CHARS] if needs_enrichment else None
+
+
+def _truncate_at_line(content: str, max_chars: int) -> str:
+    """Cut content to at most max_chars, ending on a line boundary when possible."""
+    if len(content) <= max_chars:
+        return content
+    head = content[:max_chars]
+    last_newline = head.rfind('\n')
+    return head[:last_newline + 1] if last_newline > 0 else head
+
+
+def _read_head(path: Path, max_chars: int) -> str:
+    """Read at most max_chars characters of a UTF-8 file."""
+    with open(path, 'rb') as f:
+        data = f.read(max_chars * 4)  # UTF-8 uses at most 4 bytes per character
+    return data.decode('utf-8', errors='ignore')[:max_chars]
+
+
 class LLMChunker:
     """
     LLM-assisted chunker that creates semantic chunks from code.
@@ -283,6 +483,7 @@ class LLMChunker:
         model: str = None,
         temperature: float = 0.2,
         reasoning_effort: str = None,
+        cache_path: str = None,
     ):
         # Env-driven (LLM_BASE_URL / LLM_MODEL / LLM_REASONING_EFFORT) — no
         # specific server implied.
@@ -298,6 +499,12 @@ class LLMChunker:
         )
         self._client = None  # Lazy init to avoid event loop issues
         self._client_loop = None  # Track which loop the client was created on
+        # Identical prompts (same file content, language and pass) get the
+        # same answer; skip the round trip and the JSON parse on repeats.
+        # With LLM_CACHE_PATH set this also holds across runs.
+        self._response_cache = PromptCache(
+            path=cache_path if cache_path is not None else (config.llm_cache_path or None)
+        )
         logger.info(f"LLM Chunker initialized: {self.model} @ {self.base_url}")
 
     @property
@@ -321,13 +528,20 @@ class LLMChunker:
         if needs_new_client:
             # Discard old client (don't await close - it's bound to closed loop)
             self._client = None
-            self._client = httpx.AsyncClient(timeout=180.0)
+            self._client = httpx.AsyncClient(
+                timeout=180.0,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            )
             self._client_loop = current_loop
 
         return self._client
 
-    async def _call_llm(self, prompt: str) -> str:
-        """Call the OpenAI-compatible /v1/responses endpoint."""
+    async def _call_llm(self, prompt: str) -> Optional[str]:
+        """
+        Call the OpenAI-compatible /v1/responses endpoint.
+
+        Returns None when the call fails, so failures are never cached.
+        """
         try:
             # Combine system and user content for responses API
             full_prompt = "You are a code analysis expert. Respond only with valid JSON.\n\n" + prompt
@@ -339,12 +553,19 @@ class LLMChunker:
             }
             if self.reasoning_effort:
                 payload["reasoning"] = {"effort": self.reasoning_effort}
-            response = await self.client.post(
-                f"{self.base_url}/v1/responses",
-                json=payload,
-            )
+            if HAS_ORJSON:
+                response = await self.client.post(
+                    f"{self.base_url}/v1/responses",
+                    content=orjson.dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                )
+            else:
+                response = await self.client.post(
+                    f"{self.base_url}/v1/responses",
+                    json=payload,
+                )
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content) if HAS_ORJSON else response.json()
             # Extract text from responses API format
             output = data.get("output", [])
             for item in output:
@@ -357,7 +578,7 @@ class LLMChunker:
             if "text" in data:
                 return data["text"]
             logger.warning(f"Unexpected responses API format: {data}")
-            return "[]"
+            return None
         except httpx.HTTPStatusError as e:
             # Log the response body for debugging
             try:
@@ -365,22 +586,47 @@ class LLMChunker:
                 logger.error(f"LLM call failed: {e}. Response: {error_body[:500]}")
             except:
                 logger.error(f"LLM call failed: {e}")
-            return "[]"
+            return None
         except Exception as e:
             logger.error(f"LLM call failed: {e}")
-            return "[]"
+            return None
+
+    async def _analyze_prompt(self, prompt: str) -> List[Dict]:
+        """Run a prompt through the LLM and parse the items, using the response cache."""
+        key = PromptCache.make_key(
+            self.model, str(self.temperature), self.reasoning_effort or "", prompt
+        )
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self._call_llm(prompt)
+        if response is None:
+            return []
+
+        items = self._parse_llm_response(response)
+        self._response_cache.put(key, items)
+        return items
 
     def _parse_llm_response(self, response: str) -> List[Dict]:
         """Parse JSON from LLM response, handling markdown code blocks"""
+        response = response.strip()
+
+        # Common case: the model followed instructions and returned bare JSON
+        try:
+            result = _json_loads(response)
+        except json.JSONDecodeError:
+            pass
+        else:
+            return result if isinstance(result, list) else []
+
         # Extract JSON from markdown code blocks if present
-        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response)
+        json_match = _CODE_BLOCK_RE.search(response)
         if json_match:
-            response = json_match.group(1)
-
-        response = response.strip()
+            response = json_match.group(1).strip()
 
         try:
-            result = json.loads(response)
+            result = _json_loads(response)
             if isinstance(result, list):
                 return result
             return []
@@ -388,8 +634,8 @@ class LLMChunker:
             # Try fixing invalid escape sequences (common LLM issue)
             try:
                 # Fix invalid escapes by replacing single backslashes not followed by valid escape chars
-                fixed = re.sub(r'\\(?!["\\/bfnrtu])', r'\\\\', response)
-                result = json.loads(fixed)
+                fixed = _INVALID_ESCAPE_RE.sub(r'\\\\', response)
+                result = _json_loads(fixed)
                 if isinstance(result, list):
                     return result
                 return []
@@ -418,53 +664,81 @@ class LLMChunker:
         Returns:
             List of semantic chunks found
         """
-        if passes is None:
-            passes = ENRICHMENT_PASSES
+        # Passes are independent; run them concurrently
+        results = await asyncio.gather(*[
+            self._run_pass(pass_config, file_path, content, language)
+            for pass_config in _applicable_passes(content, language, passes)
+        ])
 
         all_chunks = []
+        for chunks in results:
+            all_chunks.extend(chunks)
+        return all_chunks
 
-        for pass_config in passes:
-            # Skip if pass doesn't apply to this language
-            if pass_config.languages and language not in pass_config.languages:
-                continue
+    async def iter_chunks(
+        self,
+        file_path: str,
+        content: str,
+        language: str,
+        passes: List[EnrichmentPass] = None
+    ) -> AsyncIterator[SemanticChunk]:
+        """
+        Like analyze_file(), but yield chunks as each pass finishes instead of
+        collecting them, so consumers can start on early passes' results.
+
+        Chunks arrive in pass completion order, not pass order.
+        """
+        tasks = [
+            asyncio.ensure_future(self._run_pass(pass_config, file_path, content, language))
+            for pass_config in _applicable_passes(content, language, passes)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for chunk in await next_done:
+                    yield chunk
+        finally:
+            # Consumer stopped early: don't leave passes running
+            for task in tasks:
+                task.cancel()
+
+    async def _run_pass(
+        self,
+        pass_config: EnrichmentPass,
+        file_path: str,
+        content: str,
+        language: str,
+    ) -> List[SemanticChunk]:
+        """Run a single enrichment pass over a file."""
+        # Build prompt
+        prompt = pass_config.render(
+            language=language,
+            content=_truncate_at_line(content, MAX_PROMPT_CHARS),  # Limit content size
+        )
+
+        # Call LLM
+        logger.debug(f"Running {pass_config.name} pass on {file_path}")
+        items = await self._analyze_prompt(prompt)
 
-            # Skip small files
-            if len(content) < pass_config.min_file_size:
+        chunks = []
+        for item in items:
+            if item.get("confidence", 0) < 0.7:
                 continue
 
-            # Build prompt
-            prompt = pass_config.prompt_template.format(
-                language=language,
-                content=content[:15000],  # Limit content size
-                existing_chunks=json.dumps([c.get("symbol_name", c.get("name", "")) for c in existing_chunks[:20]])
+            chunk = SemanticChunk(
+                chunk_type=item.get("type", "unknown"),
+                name=item.get("name", "unnamed"),
+                content=item.get("content", ""),
+                start_line=item.get("start_line", 0),
+                end_line=item.get("end_line", 0),
+                purpose=item.get("purpose", ""),
+                related_symbols=item.get("related_symbols", []),
+                tags=item.get("tags", []),
+                confidence=item.get("confidence", 0.0)
             )
+            chunks.append(chunk)
+            logger.debug(f"Found {chunk.chunk_type}: {chunk.name} (confidence={chunk.confidence})")
 
-            # Call LLM
-            logger.debug(f"Running {pass_config.name} pass on {file_path}")
-            response = await self._call_llm(prompt)
-
-            # Parse response
-            items = self._parse_llm_response(response)
-
-            for item in items:
-                if item.get("confidence", 0) < 0.7:
-                    continue
-
-                chunk = SemanticChunk(
-                    chunk_type=item.get("type", "unknown"),
-                    name=item.get("name", "unnamed"),
-                    content=item.get("content", ""),
-                    start_line=item.get("start_line", 0),
-                    end_line=item.get("end_line", 0),
-                    purpose=item.get("purpose", ""),
-                    related_symbols=item.get("related_symbols", []),
-                    tags=item.get("tags", []),
-                    confidence=item.get("confidence", 0.0)
-                )
-                all_chunks.append(chunk)
-                logger.debug(f"Found {chunk.chunk_type}: {chunk.name} (confidence={chunk.confidence})")
-
-        return all_chunks
+        return chunks
 
     async def enrich_repository(
         self,
@@ -472,7 +746,9 @@ class LLMChunker:
         repo_id: str,
         file_chunks: Dict[str, List[Dict]],
         passes: List[EnrichmentPass] = None,
-        max_files: int = 100
+        max_files: int = 100,
+        max_concurrency: int = 8,
+        underchunked_only: bool = False
     ) -> Dict[str, List[SemanticChunk]]:
         """
         Run enrichment passes on a repository.
@@ -483,47 +759,70 @@ class LLMChunker:
             file_chunks: Existing chunks per file {file_path: [chunks]}
             passes: Which passes to run
             max_files: Maximum files to process (for cost control)
+            max_concurrency: Maximum files analyzed at once
+            underchunked_only: Only analyze files is_underchunked() flags
 
         Returns:
             Dict of {file_path: [SemanticChunk]}
         """
-        results = {}
-        processed = 0
-
-        for file_path, chunks in file_chunks.items():
-            if processed >= max_files:
-                break
-
-            full_path = repo_path / file_path
-            if not full_path.exists():
-                continue
-
-            try:
-                content = full_path.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                continue
-
-            # Detect language from extension
-            ext = Path(file_path).suffix
-            language_map = {
-                ".py": "python",
-                ".js": "javascript",
-                ".ts": "typescript",
-                ".sql": "sql",
-                ".svelte": "svelte"
-            }
-            language = language_map.get(ext, "unknown")
+        # Cap in-flight files so the LLM server isn't flooded; created per
+        # call because the chunker may be reused across event loops.
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze(
+            file_path: str, chunks: List[Dict], content: Optional[str]
+        ) -> Optional[List[SemanticChunk]]:
+            if content is None:
+                try:
+                    # Prompts only see the head of the file; don't read the rest.
+                    # Read off the loop (outside the semaphore) so disk IO
+                    # overlaps with in-flight LLM calls.
+                    content = await asyncio.to_thread(_read_head, repo_path / file_path, MAX_PROMPT_CHARS)
+                except Exception:
+                    return None
+
+            async with semaphore:
+                return await self.analyze_file(
+                    file_path, content, _detect_language(file_path), chunks, passes
+                )
 
-            semantic_chunks = await self.analyze_file(
-                file_path, content, language, chunks, passes
-            )
+        candidates = [
+            (file_path, chunks, None) for file_path, chunks in file_chunks.items()
+            if (repo_path / file_path).exists()
+        ]
+
+        if underchunked_only:
+            # The check is a few regex scans; run it in the thread that reads
+            # the file and pass the flagged files' heads on to analyze()
+            heads = await asyncio.gather(*[
+                asyncio.to_thread(
+                    _underchunked_head,
+                    repo_path / file_path,
+                    file_path,
+                    [c.get("symbol_name", "") for c in chunks],
+                    _detect_language(file_path),
+                )
+                for file_path, chunks, _ in candidates
+            ])
+            flagged = [
+                (file_path, chunks, head)
+                for (file_path, chunks, _), head in zip(candidates, heads)
+                if head is not None
+            ]
+            logger.info(f"{len(flagged)} of {len(candidates)} files need enrichment in {repo_id}")
+            candidates = flagged
+
+        selected = candidates[:max_files]
+        all_semantic = await asyncio.gather(*[
+            analyze(file_path, chunks, content) for file_path, chunks, content in selected
+        ])
 
+        results = {}
+        for (file_path, _, _), semantic_chunks in zip(selected, all_semantic):
             if semantic_chunks:
                 results[file_path] = semantic_chunks
                 logger.info(f"Found {len(semantic_chunks)} semantic chunks in {file_path}")
 
-            processed += 1
-
         return results
 
     def semantic_chunk_to_dict(
@@ -534,10 +833,14 @@ class LLMChunker:
         git_metadata: Dict = None
     ) -> Dict:
         """Convert SemanticChunk to storage format"""
-        content_hash = hashlib.sha256(chunk.content.encode()).hexdigest()[:16]
-        chunk_id = hashlib.sha256(
-            f"semantic:{repo_id}:{file_path}:{chunk.name}:{content_hash}".encode()
-        ).hexdigest()
+        # Feed the id components straight into the hasher rather than
+        # formatting an intermediate string; the content enters as its digest.
+        h = hashlib.blake2b(b"semantic:", digest_size=32)
+        for part in (repo_id, file_path, chunk.name):
+            h.update(part.encode())
+            h.update(b":")
+        h.update(hashlib.blake2b(chunk.content.encode(), digest_size=8).digest())
+        chunk_id = h.hexdigest()
 
         return {
             "chunk_id": chunk_id,
@@ -11,19 +11,31 @@ Usage:
     pip install anthropic  # if not installed
     export ANTHROPIC_API_KEY=your_key
     python llm_comparison_test.py
+    python llm_comparison_test.py --sequential  # one call at a time, uncontended latencies
+    python llm_comparison_test.py --cache       # reuse responses from earlier runs (temperature 0)
+    python llm_comparison_test.py --combined    # chunking + summary in one call per model
+    python llm_comparison_test.py --resume      # log results, skip ones logged by an earlier run
 """
 
 import asyncio
 import json
 import os
 import re
+import statistics
 import time
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from collections import defaultdict
+from dataclasses import dataclass, field, replace, asdict
+from typing import Optional, List, Dict, Any, Awaitable
 from pathlib import Path
 
 import httpx
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Check for anthropic SDK
 try:
     import anthropic
@@ -45,12 +57,14 @@ class ModelConfig:
 class TestResult:
     model_name: str
     task: str
-    latency_ms: float
+    latency_ms: int
     json_valid: bool
     json_parse_error: Optional[str] = None
     output: Any = None
-    raw_response: str = ""
+    raw_response: str = ""  # Kept only when the response didn't parse
     error: Optional[str] = None
+    cached: bool = False  # Served from the --cache response cache
+    ttfb_ms: Optional[int] = None  # Time to first output token (streamed calls only)
 
 
 # Model configurations
@@ -74,6 +88,19 @@ MODELS = {
     )
 }
 
+# Max concurrent requests per LM Studio endpoint, and to the Anthropic API
+LMSTUDIO_CONCURRENCY = 2
+ANTHROPIC_CONCURRENCY = 8
+
+# Output token budget per task. Generation time grows with tokens produced,
+# so a model that rambles is cut off instead of running to a blanket 4000;
+# a cut-off answer shows up as a JSON parse error.
+TASK_MAX_TOKENS = {
+    "chunking": 1500,
+    "summary": 800,
+    "combined": 2300,
+}
+
 # Test cases
 TEST_CASES = {
     "embedded_sql": {
@@ -319,53 +346,219 @@ Provide your analysis in this exact JSON format:
 Respond with only valid JSON."""
 
 
+# Backslashes that aren't valid JSON escapes (a common LLM mistake)
+_INVALID_ESCAPE_RE = re.compile(r'\\(?!["\\/bfnrtu])')
+
+
+def _json_loads(data: str | bytes) -> Any:
+    """json.loads, via orjson when available (its errors subclass JSONDecodeError)."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def extract_output_text(data: Dict) -> str:
+    """Text of the first output_text block in a /v1/responses response object."""
+    output = data.get("output", [])
+    for item in output:
+        if item.get("type") == "message":
+            content = item.get("content", [])
+            for block in content:
+                if block.get("type") == "output_text":
+                    return block.get("text", "")
+
+    return str(data)
+
+
+def extract_fenced_block(response: str) -> str:
+    r"""
+    Return the body of the first ```/```json fenced block, or response unchanged
+    if there is no complete block. Same result as group 1 of
+    ```(?:json)?\s*([\s\S]*?)\s*```, using plain string scans.
+    """
+    open_at = response.find("```")
+    if open_at == -1:
+        return response
+    body_start = open_at + 3
+    if response.startswith("json", body_start):
+        body_start += 4
+    close_at = response.find("```", body_start)
+    if close_at == -1:
+        return response
+    return response[body_start:close_at].strip()
+
+
+# Chunking and summary in one call, so the shared code block is only
+# processed once (--combined)
+COMBINED_PROMPT = """Analyze this {language} code. Do two things:
+
+1. Identify any significant code embedded in strings or important business logic patterns
+   (SQL queries in strings; validation, calculations, authorization; API patterns).
+   Only include items with confidence > 0.7.
+2. Provide a structured summary of the file.
+
+Code to analyze:
+```{language}
+{code}
+```
+
+Respond with a single JSON object in this exact format:
+{{
+    "chunks": [
+        {{
+            "type": "embedded_sql|business_logic|api_endpoint|validation",
+            "name": "descriptive_name",
+            "content": "the relevant code section",
+            "start_line": 1,
+            "end_line": 10,
+            "purpose": "What this code does",
+            "tags": ["tag1", "tag2"],
+            "confidence": 0.95
+        }}
+    ],
+    "summary": {{
+        "summary": "2-3 sentence description of what this code does",
+        "purpose": "Why does this code exist? What problem does it solve?",
+        "key_symbols": [
+            {{"name": "SymbolName", "type": "class|function", "purpose": "What it does"}}
+        ],
+        "usage_pattern": "How would a developer use this?",
+        "integrations": ["list", "of", "dependencies"],
+        "quality_notes": "Any issues noticed or null"
+    }}
+}}
+
+Use an empty "chunks" array if nothing significant is found. Respond with only valid JSON."""
+
+
+async def _as_rows(result: Awaitable[TestResult]) -> List[TestResult]:
+    return [await result]
+
+
 class LLMTester:
     """Runs comparison tests across multiple LLMs."""
 
-    def __init__(self):
-        self.http_client = httpx.AsyncClient(timeout=180.0)
+    def __init__(self, cache_path: Optional[str] = None, results_log: Optional[str] = None):
+        """
+        Args:
+            cache_path: SQLite file caching raw responses by (model_id, prompt).
+                Caching pins temperature to 0 so cached answers are reproducible.
+            results_log: JSONL file each finished result is appended to. Results
+                already in it (without errors) are reused instead of re-run, so
+                an interrupted sweep resumes where it stopped.
+        """
+        self.cache = None
+        if cache_path:
+            # Imported only for --cache: llm_cache pulls in numpy and loguru,
+            # which the harness otherwise doesn't need
+            from llm_cache import PromptCache
+            self.cache = PromptCache(path=cache_path)
+        self.temperature = 0.0 if cache_path else 0.2
+        # LM Studio is plain HTTP, so keep-alive pooling (not HTTP/2) is what
+        # saves connection setup; the long expiry outlives slow generations.
+        self.http_client = httpx.AsyncClient(
+            timeout=180.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=60.0,
+            ),
+        )
         self.anthropic_client = None
         if ANTHROPIC_AVAILABLE and os.getenv("ANTHROPIC_API_KEY"):
-            self.anthropic_client = anthropic.Anthropic()
-
-    async def call_lmstudio(self, config: ModelConfig, prompt: str) -> tuple[str, float]:
-        """Call LM Studio API, returns (response, latency_ms)."""
-        start = time.perf_counter()
-
-        response = await self.http_client.post(
+            self.anthropic_client = anthropic.AsyncAnthropic()
+
+        # Cap in-flight requests per backend. LM Studio queues anything beyond
+        # what it batches, which only inflates measured latencies. Latency is
+        # timed inside the limit, so waiting for a slot isn't counted.
+        self._endpoint_limits = {
+            base_url: asyncio.Semaphore(LMSTUDIO_CONCURRENCY)
+            for base_url in {c.base_url for c in MODELS.values() if c.provider == "lmstudio"}
+        }
+        self._anthropic_limit = asyncio.Semaphore(ANTHROPIC_CONCURRENCY)
+
+        # (model_name, task) -> result from an earlier run
+        self._logged: Dict[tuple, TestResult] = {}
+        self._log = None
+        if results_log:
+            log_path = Path(results_log)
+            if log_path.exists():
+                with open(log_path) as f:
+                    for line in f:
+                        if line.strip():
+                            result = TestResult(**json.loads(line))
+                            self._logged[(result.model_name, result.task)] = result
+                print(f"Resuming: {len(self._logged)} results loaded from {log_path}")
+            self._log = open(log_path, "a")
+
+    async def call_lmstudio(
+        self, config: ModelConfig, prompt: str, max_tokens: int
+    ) -> tuple[str, int, Optional[int]]:
+        """
+        Call LM Studio API, returns (response, latency_ms, ttfb_ms).
+
+        Streams the response so time to first output token (ttfb_ms) can be
+        told apart from total generation time. Servers that ignore "stream"
+        and answer with a plain JSON body are handled too (ttfb_ms is None).
+        """
+        start = time.perf_counter_ns()
+        ttfb = None
+
+        async with self.http_client.stream(
+            "POST",
             f"{config.base_url}/v1/responses",
             json={
                 "model": config.model_id,
                 "input": f"You are a code analysis expert. Respond only with valid JSON.\n\n{prompt}",
-                "temperature": 0.2,
-                "max_output_tokens": 4000
+                "temperature": self.temperature,
+                "max_output_tokens": max_tokens,
+                "stream": True
             }
-        )
-        response.raise_for_status()
-
-        latency = (time.perf_counter() - start) * 1000
-
-        data = response.json()
-        output = data.get("output", [])
-        for item in output:
-            if item.get("type") == "message":
-                content = item.get("content", [])
-                for block in content:
-                    if block.get("type") == "output_text":
-                        return block.get("text", ""), latency
-
-        return str(data), latency
-
-    def call_claude_sync(self, prompt: str) -> tuple[str, float]:
-        """Call Claude API (sync), returns (response, latency_ms)."""
+        ) as response:
+            response.raise_for_status()
+
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                data = _json_loads(await response.aread())
+                latency = (time.perf_counter_ns() - start) // 1_000_000
+                return extract_output_text(data), latency, ttfb
+
+            parts = []
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                event = _json_loads(payload)
+                event_type = event.get("type")
+                if event_type == "response.output_text.delta":
+                    if ttfb is None:
+                        ttfb = (time.perf_counter_ns() - start) // 1_000_000
+                    parts.append(event.get("delta", ""))
+                elif event_type == "response.completed":
+                    if not parts:
+                        # No deltas were sent; take the text from the final response
+                        parts.append(extract_output_text(event.get("response", {})))
+                    break
+                elif event_type in ("response.failed", "error"):
+                    raise RuntimeError(f"LM Studio stream error: {payload[:500]}")
+
+        latency = (time.perf_counter_ns() - start) // 1_000_000
+        return "".join(parts), latency, ttfb
+
+    async def call_claude(self, prompt: str, max_tokens: int) -> tuple[str, int]:
+        """Call Claude API, returns (response, latency_ms)."""
         if not self.anthropic_client:
             raise RuntimeError("Anthropic client not available")
 
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
 
-        message = self.anthropic_client.messages.create(
+        # Only pinned when caching; otherwise keep the API's default sampling
+        extra = {"temperature": self.temperature} if self.cache is not None else {}
+        message = await self.anthropic_client.messages.create(
             model=MODELS["claude"].model_id,
-            max_tokens=4000,
+            max_tokens=max_tokens,
+            **extra,
             messages=[
                 {
                     "role": "user",
@@ -374,26 +567,22 @@ class LLMTester:
             ]
         )
 
-        latency = (time.perf_counter() - start) * 1000
+        latency = (time.perf_counter_ns() - start) // 1_000_000
         return message.content[0].text, latency
 
     def parse_json_response(self, response: str) -> tuple[bool, Any, Optional[str]]:
         """Parse JSON from response. Returns (valid, parsed, error)."""
         # Extract JSON from markdown code blocks if present
-        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response)
-        if json_match:
-            response = json_match.group(1)
-
-        response = response.strip()
+        response = extract_fenced_block(response).strip()
 
         try:
-            parsed = json.loads(response)
+            parsed = _json_loads(response)
             return True, parsed, None
         except json.JSONDecodeError as e:
             # Try fixing common issues
             try:
-                fixed = re.sub(r'\\(?!["\\/bfnrtu])', r'\\\\', response)
-                parsed = json.loads(fixed)
+                fixed = _INVALID_ESCAPE_RE.sub(r'\\\\', response)
+                parsed = _json_loads(fixed)
                 return True, parsed, None
             except json.JSONDecodeError:
                 return False, None, str(e)
@@ -402,14 +591,58 @@ class LLMTester:
         self,
         model_key: str,
         task_name: str,
-        prompt: str
+        prompt: str,
+        max_tokens: int
     ) -> TestResult:
-        """Run a single test."""
+        """Run a single test, reusing its result from the results log if present."""
         config = MODELS[model_key]
 
+        logged = self._logged.get((config.name, task_name))
+        if logged is not None:
+            return logged
+
+        result = await self._run_test(config, task_name, prompt, max_tokens)
+
+        # Errors aren't logged so a resumed run retries them
+        if self._log is not None and not result.error:
+            self._log.write(json.dumps(asdict(result)) + "\n")
+            self._log.flush()
+
+        return result
+
+    async def _run_test(
+        self,
+        config: ModelConfig,
+        task_name: str,
+        prompt: str,
+        max_tokens: int
+    ) -> TestResult:
+        """Call the model for one test and parse its response."""
+
+        cache_key = (
+            self.cache.make_key(config.model_id, str(max_tokens), prompt)
+            if self.cache is not None else None
+        )
+        if cache_key:
+            hit = self.cache.get(cache_key)
+            if hit is not None:
+                json_valid, parsed, parse_error = self.parse_json_response(hit["raw"])
+                return TestResult(
+                    model_name=config.name,
+                    task=task_name,
+                    latency_ms=hit["latency"],  # Latency of the original call
+                    ttfb_ms=hit.get("ttfb"),
+                    json_valid=json_valid,
+                    json_parse_error=parse_error,
+                    output=parsed,
+                    raw_response="" if json_valid else hit["raw"],
+                    cached=True
+                )
+
         try:
             if config.provider == "lmstudio":
-                raw_response, latency = await self.call_lmstudio(config, prompt)
+                async with self._endpoint_limits[config.base_url]:
+                    raw_response, latency, ttfb = await self.call_lmstudio(config, prompt, max_tokens)
             elif config.provider == "anthropic":
                 if not self.anthropic_client:
                     return TestResult(
@@ -419,11 +652,16 @@ class LLMTester:
                         json_valid=False,
                         error="Anthropic API key not set"
                     )
-                raw_response, latency = self.call_claude_sync(prompt)
+                async with self._anthropic_limit:
+                    raw_response, latency = await self.call_claude(prompt, max_tokens)
+                ttfb = None
             else:
                 raise ValueError(f"Unknown provider: {config.provider}")
 
             json_valid, parsed, parse_error = self.parse_json_response(raw_response)
+            # Unparseable (e.g. truncated) answers are retried on the next run
+            if cache_key and json_valid:
+                self.cache.put(cache_key, {"raw": raw_response, "latency": latency, "ttfb": ttfb})
 
             return TestResult(
                 model_name=config.name,
@@ -432,7 +670,10 @@ class LLMTester:
                 json_valid=json_valid,
                 json_parse_error=parse_error,
                 output=parsed,
-                raw_response=raw_response
+                # Parsed output is all that's reported for valid responses;
+                # don't hold every raw payload until the summary
+                raw_response="" if json_valid else raw_response,
+                ttfb_ms=ttfb
             )
 
         except Exception as e:
@@ -444,14 +685,63 @@ class LLMTester:
                 error=str(e)
             )
 
+    async def run_combined_test(
+        self,
+        model_key: str,
+        case_name: str,
+        prompt: str
+    ) -> List[TestResult]:
+        """
+        Run COMBINED_PROMPT once and split the answer into chunking and summary
+        rows, so they report like the separate tasks. Both rows carry the
+        single call's latency.
+        """
+        result = await self.run_test(
+            model_key, f"{case_name} - Combined", prompt, TASK_MAX_TOKENS["combined"]
+        )
+
+        rows = []
+        for key, task, expected_type in (("chunks", "Chunking", list), ("summary", "Summary", dict)):
+            part = result.output.get(key) if isinstance(result.output, dict) else None
+            valid = result.json_valid and isinstance(part, expected_type)
+            parse_error = result.json_parse_error
+            if result.json_valid and not valid:
+                parse_error = f"missing or malformed '{key}' in combined response"
+            rows.append(replace(
+                result,
+                task=f"{case_name} - {task} (combined)",
+                json_valid=valid,
+                json_parse_error=parse_error,
+                output=part if valid else None,
+            ))
+        return rows
+
     async def close(self):
+        if self._log is not None:
+            self._log.close()
         await self.http_client.aclose()
+        if self.anthropic_client:
+            await self.anthropic_client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def latency_percentiles(latencies: List[int]) -> tuple[int, int]:
+    """Return (p50, p95) of latencies in ms."""
+    if len(latencies) < 2:
+        return latencies[0], latencies[0]
+    p95 = statistics.quantiles(latencies, n=20, method="inclusive")[18]
+    return round(statistics.median(latencies)), round(p95)
 
 
 def print_result(result: TestResult, verbose: bool = False):
     """Pretty print a test result."""
     status = "✅" if result.json_valid else "❌"
     latency = f"{result.latency_ms:.0f}ms"
+    if result.ttfb_ms is not None:
+        latency += f" (first token {result.ttfb_ms:.0f}ms)"
+    if result.cached:
+        latency += " (cached)"
 
     print(f"\n{'='*60}")
     print(f"{status} {result.model_name} | {result.task} | {latency}")
@@ -484,16 +774,42 @@ def print_result(result: TestResult, verbose: bool = False):
         print(f"\nFull output:\n{json.dumps(result.output, indent=2)[:1000]}")
 
 
-async def run_comparison(test_cases: List[str] = None, verbose: bool = False):
-    """Run full A/B/C comparison."""
+async def run_comparison(
+    test_cases: List[str] = None,
+    verbose: bool = False,
+    sequential: bool = False,
+    cache_path: Optional[str] = None,
+    combined: bool = False,
+    results_log: Optional[str] = None
+):
+    """
+    Run full A/B/C comparison.
+
+    Model calls run concurrently by default; pass sequential=True (--sequential)
+    to measure each call's latency without contention from the others.
+    With cache_path (--cache), repeat runs reuse earlier responses.
+    With combined=True (--combined), each model answers both tasks in one call.
+    With results_log (--resume), finished results are appended to a JSONL file
+    and reused on the next run.
+    """
 
     print("\n" + "="*70)
     print("LLM COMPARISON TEST: Granite vs Qwen vs Claude")
     print("="*70)
 
-    tester = LLMTester()
+    tester = LLMTester(cache_path=cache_path, results_log=results_log)
+
+    # Check which models are available. Health checks run concurrently, once
+    # per LM Studio endpoint, so unreachable hosts cost one timeout in total.
+    base_urls = list(dict.fromkeys(
+        config.base_url for config in MODELS.values() if config.provider != "anthropic"
+    ))
+    checks = await asyncio.gather(
+        *[tester.http_client.get(f"{url}/v1/models", timeout=5.0) for url in base_urls],
+        return_exceptions=True
+    )
+    health = dict(zip(base_urls, checks))
 
-    # Check which models are available
     available_models = []
     for key, config in MODELS.items():
         if config.provider == "anthropic":
@@ -504,12 +820,12 @@ async def run_comparison(test_cases: List[str] = None, verbose: bool = False):
                 print(f"⚠️  {config.name} skipped (no API key)")
         else:
             # Quick health check for LM Studio models
-            try:
-                await tester.http_client.get(f"{config.base_url}/v1/models", timeout=5.0)
+            check = health[config.base_url]
+            if isinstance(check, Exception):
+                print(f"⚠️  {config.name} unavailable: {check}")
+            else:
                 available_models.append(key)
                 print(f"✅ {config.name} available")
-            except Exception as e:
-                print(f"⚠️  {config.name} unavailable: {e}")
 
     if not available_models:
         print("No models available!")
@@ -518,13 +834,20 @@ async def run_comparison(test_cases: List[str] = None, verbose: bool = False):
     # Filter test cases
     cases_to_run = test_cases or list(TEST_CASES.keys())
 
-    all_results = []
-
+    # One job per (case, model, task), or per (case, model) in combined
+    # mode; each case's jobs stay contiguous so results print grouped by case
+    jobs = []
     for case_key in cases_to_run:
         case = TEST_CASES[case_key]
-        print(f"\n{'='*70}")
-        print(f"TEST: {case['name']}")
-        print(f"{'='*70}")
+
+        if combined:
+            combined_prompt = COMBINED_PROMPT.format(
+                language=case["language"],
+                code=case["code"]
+            )
+            for model_key in available_models:
+                jobs.append((case_key, tester.run_combined_test(model_key, case["name"], combined_prompt)))
+            continue
 
         # Test chunking task
         chunking_prompt = CHUNKING_PROMPT.format(
@@ -539,21 +862,32 @@ async def run_comparison(test_cases: List[str] = None, verbose: bool = False):
         )
 
         for model_key in available_models:
-            # Chunking test
-            result = await tester.run_test(
-                model_key,
-                f"{case['name']} - Chunking",
-                chunking_prompt
-            )
-            all_results.append(result)
-            print_result(result, verbose)
+            jobs.append((case_key, _as_rows(tester.run_test(
+                model_key, f"{case['name']} - Chunking", chunking_prompt, TASK_MAX_TOKENS["chunking"]
+            ))))
+            jobs.append((case_key, _as_rows(tester.run_test(
+                model_key, f"{case['name']} - Summary", summary_prompt, TASK_MAX_TOKENS["summary"]
+            ))))
+
+    # Calls are independent network I/O; run them concurrently unless
+    # sequential latencies (no contention between calls) are wanted
+    # (coroutines don't start until awaited, so sequential mode runs in order)
+    if sequential:
+        job_rows = []
+        for _, job in jobs:
+            job_rows.append(await job)
+    else:
+        job_rows = await asyncio.gather(*[job for _, job in jobs])
 
-            # Summary test
-            result = await tester.run_test(
-                model_key,
-                f"{case['name']} - Summary",
-                summary_prompt
-            )
+    all_results = []
+    current_case = None
+    for (case_key, _), rows in zip(jobs, job_rows):
+        if case_key != current_case:
+            current_case = case_key
+            print(f"\n{'='*70}")
+            print(f"TEST: {TEST_CASES[case_key]['name']}")
+            print(f"{'='*70}")
+        for result in rows:
             all_results.append(result)
             print_result(result, verbose)
 
@@ -563,29 +897,22 @@ async def run_comparison(test_cases: List[str] = None, verbose: bool = False):
     print("="*70)
 
     # Group by model
-    model_stats = {}
+    model_stats = defaultdict(lambda: {"total": 0, "json_valid": 0, "latencies": [], "errors": 0})
     for result in all_results:
-        if result.model_name not in model_stats:
-            model_stats[result.model_name] = {
-                "total": 0,
-                "json_valid": 0,
-                "total_latency": 0,
-                "errors": 0
-            }
         stats = model_stats[result.model_name]
         stats["total"] += 1
         if result.json_valid:
             stats["json_valid"] += 1
         if result.error:
             stats["errors"] += 1
-        stats["total_latency"] += result.latency_ms
+        stats["latencies"].append(result.latency_ms)
 
-    print(f"\n{'Model':<20} {'Success Rate':<15} {'Avg Latency':<15} {'Errors':<10}")
-    print("-" * 60)
+    print(f"\n{'Model':<20} {'Success Rate':<15} {'p50 Latency':<15} {'p95 Latency':<15} {'Errors':<10}")
+    print("-" * 75)
     for model_name, stats in model_stats.items():
         success_rate = f"{stats['json_valid']}/{stats['total']}"
-        avg_latency = f"{stats['total_latency']/max(stats['total'],1):.0f}ms"
-        print(f"{model_name:<20} {success_rate:<15} {avg_latency:<15} {stats['errors']:<10}")
+        p50, p95 = latency_percentiles(stats["latencies"])
+        print(f"{model_name:<20} {success_rate:<15} {f'{p50}ms':<15} {f'{p95}ms':<15} {stats['errors']:<10}")
 
     await tester.close()
 
@@ -596,6 +923,10 @@ if __name__ == "__main__":
     import sys
 
     verbose = "-v" in sys.argv or "--verbose" in sys.argv
+    sequential = "--sequential" in sys.argv
+    cache_path = ".llm_test_cache.sqlite" if "--cache" in sys.argv else None
+    combined = "--combined" in sys.argv
+    results_log = "llm_comparison_results.jsonl" if "--resume" in sys.argv else None
 
     # Optional: specify test cases
     # e.g., python llm_comparison_test.py embedded_sql business_logic
@@ -603,4 +934,4 @@ if __name__ == "__main__":
     if not test_cases:
         test_cases = None  # Run all
 
-    asyncio.run(run_comparison(test_cases, verbose))
+    asyncio.run(run_comparison(test_cases, verbose, sequential, cache_path, combined, results_log))
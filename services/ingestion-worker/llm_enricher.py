@@ -12,25 +12,208 @@ LLM_PROVIDER / LLM_REASONING_EFFORT); see LLM_CONFIG below.
 
 import asyncio
 import json
+import random
 import re
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
-from pathlib import Path
+import time
+from itertools import islice
+from collections import deque
+from dataclasses import dataclass, asdict, field
+from typing import Optional, List, Dict, Any, Tuple, Deque, Awaitable
 
 import httpx
 from loguru import logger
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from prometheus_client import Counter, Histogram
+    HAS_PROMETHEUS = True
+except ImportError:
+    HAS_PROMETHEUS = False
+
 from config import WorkerConfig
+from llm_cache import PromptCache, SemanticCache
 
 config = WorkerConfig()
 
+if HAS_PROMETHEUS:
+    # Exported by whatever prometheus_client HTTP server the process starts
+    LLM_LATENCY = Histogram(
+        "llm_enricher_latency_seconds", "LLM call latency", ["provider", "method"]
+    )
+    LLM_TOKENS = Counter(
+        "llm_enricher_tokens_total", "LLM tokens used", ["provider", "direction"]
+    )
+
+def _json_loads(data: str | bytes) -> Any:
+    """json.loads, via orjson when available (its errors subclass JSONDecodeError)."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _output_text(data: Dict[str, Any]) -> str:
+    """Extract the output text from a /v1/responses response body."""
+    # Response structure: {"output": [{"type": "message", "content": [{"type": "output_text", "text": "..."}]}]}
+    output = data.get("output", [])
+    for item in output:
+        if item.get("type") == "message":
+            content = item.get("content", [])
+            for block in content:
+                if block.get("type") == "output_text":
+                    return block.get("text", "")
+    # Fallback: try to get text directly if format differs
+    if "text" in data:
+        return data["text"]
+    raise ValueError(f"Could not extract text from responses API: {data}")
+
+
+# Characters that matter when scanning for the end of a JSON value
+_JSON_SCAN_RE = re.compile(r'["\\{}\[\]]')
+
+
+def _extract_first_json(text: str, opener: str = "{") -> Optional[str]:
+    """
+    Return the first balanced JSON object (or array, with opener="[") in text
+    that parses.
+
+    Each candidate is one forward pass tracking bracket depth and skipping
+    string literals, so unlike a greedy regex it stops at the end of the
+    value: prose or braces the model adds before or after it are ignored.
+    """
+    closer = "}" if opener == "{" else "]"
+    start = text.find(opener)
+    while start >= 0:
+        candidate = _balanced_from(text, start, opener, closer)
+        if candidate is not None:
+            try:
+                _json_loads(candidate)
+                return candidate
+            except ValueError:
+                pass
+        start = text.find(opener, start + 1)
+    return None
+
+
+def _balanced_from(text: str, start: int, opener: str, closer: str) -> Optional[str]:
+    """Return text[start:] up to the bracket that balances text[start], or None."""
+    depth = 0
+    in_string = False
+    skip_to = 0  # index after an escaped character
+    for match in _JSON_SCAN_RE.finditer(text, start):
+        i = match.start()
+        if i < skip_to:
+            continue
+        c = match.group()
+        if in_string:
+            if c == "\\":
+                skip_to = i + 2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == opener:
+            depth += 1
+        elif c == closer:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _is_usable_response(text: str, stop_after_json: Optional[str]) -> bool:
+    """Whether a response is worth caching: non-empty, and holding a parseable
+    JSON value when the caller asked for one."""
+    if stop_after_json:
+        return _extract_first_json(text, stop_after_json) is not None
+    return bool(text.strip())
+
+
+# enrich_file sends at most this much of a file to the LLM
+_MAX_FILE_CHARS = 6000
+_TRUNCATION_NOTE = f"(Content truncated to first {_MAX_FILE_CHARS} chars)"
+
+# Output instructions for enrich_file/enrich_symbol, sent as the system
+# message. They never vary, so the per-call prompt is only the code.
+SYSTEM_PROMPT_FILE = """You analyze source files and provide a structured summary.
+
+Provide your analysis in this exact JSON format (no markdown, just JSON):
+{
+    "summary": "2-3 sentence description of what this file does",
+    "purpose": "Why does this file exist? What problem does it solve?",
+    "key_symbols": [
+        {"name": "SymbolName", "type": "class|function|constant", "purpose": "What it does"}
+    ],
+    "usage_pattern": "How would a developer typically use this file/module?",
+    "integrations": ["list", "of", "modules", "this", "connects", "to"],
+    "quality_notes": "Any issues noticed (missing docstrings, complexity, etc.) or null"
+}
+
+Respond with only valid JSON, no explanation."""
+
+SYSTEM_PROMPT_SYMBOL = """You analyze a class, function or method and explain how to use it.
+
+Provide your analysis in this exact JSON format:
+{
+    "summary": "1-2 sentence description of what it does",
+    "purpose": "When would a developer use this?",
+    "key_symbols": [
+        {"name": "method_name", "type": "method", "purpose": "What it does"}
+    ],
+    "usage_pattern": "Example of how to use this (code snippet or description)",
+    "integrations": ["what", "this", "connects", "to"],
+    "quality_notes": "Any issues or null"
+}
+
+Respond with only valid JSON."""
+
+# JSON schema of the objects described by the system prompts above. With
+# LLMConfig.structured_output the server constrains decoding to it, so the
+# model can't emit prose around the JSON or malformed JSON.
+ENRICHMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "purpose": {"type": "string"},
+        "key_symbols": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string"},
+                    "purpose": {"type": "string"},
+                },
+                "required": ["name", "type", "purpose"],
+                "additionalProperties": False,
+            },
+        },
+        "usage_pattern": {"type": ["string", "null"]},
+        "integrations": {"type": "array", "items": {"type": "string"}},
+        "quality_notes": {"type": ["string", "null"]},
+    },
+    "required": [
+        "summary", "purpose", "key_symbols", "usage_pattern", "integrations", "quality_notes",
+    ],
+    "additionalProperties": False,
+}
+
+
+def _symbol_cache_text(symbol_name: str, symbol_type: str, file_path: str, code: str) -> str:
+    """Text embedded as the semantic cache key for a symbol."""
+    return f"{symbol_type.capitalize()}: {symbol_name}\nFile: {file_path}\n{code}"
+
 
 class LLMUnavailableError(Exception):
     """Raised when LLM is unavailable (circuit breaker open or persistent failures)"""
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class EnrichmentResult:
     """Result from LLM enrichment"""
     summary: str
@@ -42,6 +225,116 @@ class EnrichmentResult:
     raw_response: str
 
 
+def _enrichment_from_json(data: Any, raw_response: str) -> EnrichmentResult:
+    """
+    Build an EnrichmentResult from the model's parsed JSON.
+
+    Fields the model got wrong (missing, or the wrong type, e.g. a string
+    where a list belongs) get empty defaults instead of leaking through.
+    """
+    if not isinstance(data, dict):
+        data = {}
+    key_symbols = data.get("key_symbols")
+    integrations = data.get("integrations")
+    usage_pattern = data.get("usage_pattern")
+    quality_notes = data.get("quality_notes")
+    return EnrichmentResult(
+        summary=str(data.get("summary") or ""),
+        purpose=str(data.get("purpose") or ""),
+        key_symbols=[s for s in key_symbols if isinstance(s, dict)] if isinstance(key_symbols, list) else [],
+        usage_pattern=usage_pattern if isinstance(usage_pattern, str) else None,
+        integrations=[str(i) for i in integrations] if isinstance(integrations, list) else [],
+        quality_notes=quality_notes if isinstance(quality_notes, str) else None,
+        raw_response=raw_response
+    )
+
+
+# Python comments and triple-quoted strings (docstrings), stripped before
+# judging whether a file has enough code to be worth an LLM call
+_PY_NON_CODE_RE = re.compile(r'#[^\n]*|"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'')
+# A file made only of import statements (e.g. an __init__.py re-exporting names)
+_PY_IMPORTS_ONLY_RE = re.compile(
+    r'(?:(?:from\s+\S+\s+import\s+(?:\([^)]*\)|[^\n]+)|import\s+[^\n]+)\s*)*'
+)
+_PY_IMPORTED_MODULE_RE = re.compile(r'^\s*(?:from|import)\s+([\w.]+)', re.MULTILINE)
+# Files with less code than this are summarized without the LLM
+_TRIVIAL_CODE_CHARS = 50
+
+
+def _trivial_enrichment(file_path: str, content: str, language: str) -> Optional[EnrichmentResult]:
+    """
+    Describe files whose enrichment is predictable without the LLM: near-empty
+    modules and Python files that only import (package re-exports).
+
+    Returns:
+        EnrichmentResult, or None if the file needs the LLM
+    """
+    if language == "python":
+        code = _PY_NON_CODE_RE.sub("", content).strip()
+    else:
+        code = content.strip()
+
+    if len(code) < _TRIVIAL_CODE_CHARS:
+        return EnrichmentResult(
+            summary=f"Trivial {language} file with little or no code.",
+            purpose="Placeholder or marker file",
+            key_symbols=[],
+            usage_pattern=None,
+            integrations=[],
+            quality_notes=None,
+            raw_response=""
+        )
+
+    if language == "python" and _PY_IMPORTS_ONLY_RE.fullmatch(code):
+        if file_path.endswith("__init__.py"):
+            package = file_path.rsplit("/", 1)[0] if "/" in file_path else "the package"
+            summary = f"Package initializer for {package} that re-exports names from its modules."
+            usage = f"Import names from {package} directly instead of from its submodules."
+        else:
+            summary = "Module that only re-exports names imported from other modules."
+            usage = "Import the re-exported names from this module."
+        return EnrichmentResult(
+            summary=summary,
+            purpose="Module init",
+            key_symbols=[],
+            usage_pattern=usage,
+            integrations=list(dict.fromkeys(_PY_IMPORTED_MODULE_RE.findall(code))),
+            quality_notes=None,
+            raw_response=""
+        )
+
+    return None
+
+
+@dataclass
+class LLMCallStats:
+    """Latency and token counts for an enricher's LLM calls."""
+    calls: int = 0
+    failures: int = 0
+    cache_hits: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    # Latencies of recent successful calls, for percentiles
+    latencies_ms: Deque[int] = field(default_factory=lambda: deque(maxlen=10000))
+
+    def to_dict(self) -> Dict:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "cache_hits": self.cache_hits,
+            "tokens": {
+                "input": self.input_tokens,
+                "output": self.output_tokens,
+            },
+            "latency_ms": {
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "max": latencies[-1],
+            } if latencies else {},
+        }
+
+
 @dataclass
 class LLMConfig:
     """Configuration for LLM provider"""
@@ -52,9 +345,38 @@ class LLMConfig:
     max_tokens: int = 2000
     timeout_seconds: float = 60.0  # Per-request timeout
     max_retries: int = 2  # Retries on failure
+    # Exponential backoff between retries: base_delay * 2**attempt, capped at
+    # max_delay, with random jitter so concurrent callers don't retry in step
+    base_delay: float = 0.5
+    max_delay: float = 30.0
     # LM Studio /v1/responses "reasoning.effort" — set to "none" to disable thinking.
     # Leave None for the model's default behavior.
     reasoning_effort: Optional[str] = None
+    # Stream JSON-returning calls and stop reading once the JSON is complete
+    stream: bool = False
+    # Reuse responses for identical requests instead of calling the LLM again.
+    # cache_path adds a SQLite tier so the cache survives restarts.
+    cache_enabled: bool = True
+    cache_path: Optional[str] = None
+    # Reuse enrichment results for near-duplicate code (needs an embedder
+    # passed to LLMEnricher). Cosine similarity threshold for a hit.
+    semantic_cache_enabled: bool = False
+    semantic_threshold: float = 0.95
+    # Symbols shorter than size_threshold_chars go to this (smaller, faster)
+    # model instead; None sends everything to this config's model.
+    small_model_config: Optional["LLMConfig"] = None
+    size_threshold_chars: int = 500
+    # Ollama only: use the native /api/chat endpoint, which (unlike the
+    # OpenAI-compatible ones) honors keep_alive, so the model stays loaded
+    # between batches instead of being evicted after Ollama's 5 min default.
+    ollama_native: bool = False
+    keep_alive: str = "30m"
+    # Ask the server to constrain JSON-returning calls (enrich_file,
+    # enrich_symbol) to their schema (json_schema text format; "format" on
+    # Ollama's /api/chat). Needs a server with grammar-constrained sampling
+    # (LM Studio, llama.cpp, vLLM, recent Ollama). The V4 pipeline asks for
+    # prose summaries, so it is not set from the environment.
+    structured_output: bool = False
 
 
 # Single env-driven config — no specific server implied. All fields come from
@@ -70,6 +392,20 @@ LLM_CONFIG = LLMConfig(
     base_url=config.llm_base_url,
     temperature=0.3,
     reasoning_effort=config.llm_reasoning_effort or None,
+    cache_path=config.llm_cache_path or None,
+    ollama_native=config.llm_ollama_native,
+    keep_alive=config.llm_keep_alive,
+    # LLM_SMALL_MODEL (same server) handles short symbols when set
+    small_model_config=LLMConfig(
+        provider=config.llm_provider,
+        model=config.llm_small_model,
+        base_url=config.llm_base_url,
+        temperature=0.3,
+        reasoning_effort=config.llm_reasoning_effort or None,
+        cache_path=config.llm_cache_path or None,
+        ollama_native=config.llm_ollama_native,
+        keep_alive=config.llm_keep_alive,
+    ) if config.llm_small_model else None,
 )
 
 DEFAULT_CONFIG = LLM_CONFIG
@@ -78,17 +414,65 @@ DEFAULT_CONFIG = LLM_CONFIG
 class LLMEnricher:
     """Enriches code chunks using local LLMs"""
 
-    def __init__(self, config: LLMConfig = LLM_CONFIG):
+    def __init__(self, config: LLMConfig = LLM_CONFIG, embedder=None):
+        """
+        Args:
+            config: LLM provider configuration
+            embedder: Object with generate_embedding(text) -> List[float] (e.g.
+                LocalEmbeddingGenerator); keys the semantic cache
+        """
         self.config = config
+        self.embedder = embedder
         self._client = None  # Lazy init to avoid event loop issues
         self._client_loop = None  # Track which loop the client was created on
         self._consecutive_failures = 0
         self._max_consecutive_failures = 5  # Circuit breaker threshold
+        # Once open, the breaker rejects calls for the cooldown, then lets a
+        # single probe through (half-open): success closes it, failure reopens it
+        self._opened_at: Optional[float] = None
+        self._cooldown_seconds = 30.0
+        self._probe_in_flight = False
+        self.trivial_skipped = 0  # enrich_file calls answered without the LLM
+        self.stats = LLMCallStats()
+        # Re-ingesting unchanged files produces identical prompts; serve those
+        # from the cache instead of the LLM.
+        self._response_cache = PromptCache(path=config.cache_path) if config.cache_enabled else None
+        # Code that differs only in whitespace or comments gets the same
+        # enrichment; one cache per task so files never match symbols. The
+        # *_summary kinds hold V4LLMEnricher's prose summaries.
+        self._semantic_caches: Dict[str, SemanticCache] = {}
+        if config.semantic_cache_enabled:
+            self._semantic_caches = {
+                kind: SemanticCache(
+                    threshold=config.semantic_threshold,
+                    path=config.cache_path,
+                    namespace=f"{config.provider}/{config.model}/{kind}",
+                )
+                for kind in ("file", "symbol", "file_summary", "symbol_summary")
+            }
+        # Set on the small-model sibling so both share one connection pool
+        self._client_source: Optional["LLMEnricher"] = None
+        self._small: Optional["LLMEnricher"] = None
+        if config.small_model_config is not None:
+            self._small = LLMEnricher(config.small_model_config, embedder)
+            self._small._client_source = self
         logger.info(f"LLM Enricher initialized: {config.provider}/{config.model} (timeout={config.timeout_seconds}s)")
 
+    def for_code(self, code: str) -> "LLMEnricher":
+        """
+        Pick the enricher for a piece of code: the small-model sibling for
+        code shorter than config.size_threshold_chars, otherwise self.
+        """
+        if self._small is not None and len(code) < self.config.size_threshold_chars:
+            return self._small
+        return self
+
     @property
     def client(self):
         """Get httpx client, creating fresh one if needed for current event loop."""
+        if self._client_source is not None:
+            return self._client_source.client
+
         try:
             current_loop = asyncio.get_running_loop()
         except RuntimeError:
@@ -105,42 +489,247 @@ class LLMEnricher:
         )
 
         if needs_new_client:
-            # Discard old client (don't await close - it's bound to closed loop)
-            self._client = None
-            self._client = httpx.AsyncClient(timeout=self.config.timeout_seconds)
+            old_client, old_loop = self._client, self._client_loop
+            # Can't await the old client's close here; if its loop is still
+            # running (another thread), close it there so sockets don't leak.
+            # Otherwise it's bound to a finished loop and is simply dropped.
+            if old_client is not None and old_loop is not None and old_loop.is_running():
+                old_loop.call_soon_threadsafe(lambda: old_loop.create_task(old_client.aclose()))
+            # Keep connections to the LLM server alive across calls so
+            # concurrent enrichments don't each pay a new TCP handshake.
+            self._client = httpx.AsyncClient(
+                timeout=self.config.timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=64,
+                    max_keepalive_connections=32,
+                    keepalive_expiry=60.0,
+                ),
+            )
             self._client_loop = current_loop
 
         return self._client
 
-    async def _call_responses(self, prompt: str) -> str:
-        """Call the OpenAI-compatible /v1/responses endpoint."""
+    def _circuit_open(self) -> bool:
+        """True while the circuit breaker is open and cooling down."""
+        return (
+            self._opened_at is not None
+            and time.monotonic() - self._opened_at < self._cooldown_seconds
+        )
+
+    def _enter_circuit(self) -> bool:
+        """
+        Check the circuit breaker before a call.
+
+        Returns:
+            True if this call is the half-open probe (it gets a single attempt)
+
+        Raises:
+            LLMUnavailableError: If the breaker is open, or another call is
+                already probing
+        """
+        if self._opened_at is None:
+            return False
+        if self._circuit_open() or self._probe_in_flight:
+            logger.warning(f"LLM circuit breaker OPEN ({self._consecutive_failures} consecutive failures)")
+            raise LLMUnavailableError("LLM unavailable - circuit breaker open")
+        logger.info("LLM circuit breaker half-open, probing")
+        self._probe_in_flight = True
+        return True
+
+    async def _timed(self, method: str, call: Awaitable[Any]) -> Any:
+        """Await an LLM call, recording its latency and outcome in self.stats."""
+        started = time.perf_counter()
+        self.stats.calls += 1
+        try:
+            result = await call
+        except BaseException:
+            self.stats.failures += 1
+            raise
+        elapsed = time.perf_counter() - started
+        self.stats.latencies_ms.append(int(elapsed * 1000))
+        if HAS_PROMETHEUS:
+            LLM_LATENCY.labels(self.config.provider, method).observe(elapsed)
+        return result
+
+    def _record_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """Add a /v1/responses usage block to the token counts."""
+        if not usage:
+            return
+        input_tokens = usage.get("input_tokens") or 0
+        output_tokens = usage.get("output_tokens") or 0
+        self.stats.input_tokens += input_tokens
+        self.stats.output_tokens += output_tokens
+        if HAS_PROMETHEUS:
+            LLM_TOKENS.labels(self.config.provider, "in").inc(input_tokens)
+            LLM_TOKENS.labels(self.config.provider, "out").inc(output_tokens)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before retry number attempt + 1: base_delay doubled
+        per attempt up to max_delay, then jittered to 50-150% of that.
+        """
+        delay = min(self.config.max_delay, self.config.base_delay * (2 ** attempt))
+        return delay * (0.5 + random.random())
+
+    def _record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("LLM circuit breaker closed")
+        self._consecutive_failures = 0
+        self._opened_at = None
+
+    def _record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self._max_consecutive_failures:
+            # Opens the breaker, or restarts the cooldown after a failed probe
+            self._opened_at = time.monotonic()
+
+    def _responses_payload(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Request body for the /v1/responses endpoint."""
         payload = {
             "model": self.config.model,
-            "input": prompt,
+            # A constant system message goes first so servers with prompt
+            # caching reuse its KV across requests
+            "input": (
+                [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+                if system else prompt
+            ),
             "temperature": self.config.temperature,
-            "max_output_tokens": self.config.max_tokens,
+            "max_output_tokens": max_tokens or self.config.max_tokens,
         }
         if self.config.reasoning_effort is not None:
             payload["reasoning"] = {"effort": self.config.reasoning_effort}
+        if json_schema is not None:
+            payload["text"] = {
+                "format": {
+                    "type": "json_schema",
+                    "name": "enrichment",
+                    "schema": json_schema,
+                    "strict": True,
+                }
+            }
+        return payload
+
+    async def _call_responses(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Call the OpenAI-compatible /v1/responses endpoint."""
         response = await self.client.post(
             f"{self.config.base_url}/v1/responses",
-            json=payload,
+            json=self._responses_payload(prompt, max_tokens, system, json_schema),
         )
         response.raise_for_status()
-        data = response.json()
-        # Extract text from the responses API format
-        # Response structure: {"output": [{"type": "message", "content": [{"type": "output_text", "text": "..."}]}]}
-        output = data.get("output", [])
-        for item in output:
-            if item.get("type") == "message":
-                content = item.get("content", [])
-                for block in content:
-                    if block.get("type") == "output_text":
-                        return block.get("text", "")
-        # Fallback: try to get text directly if format differs
-        if "text" in data:
-            return data["text"]
-        raise ValueError(f"Could not extract text from responses API: {data}")
+        data = _json_loads(response.content)
+        self._record_usage(data.get("usage"))
+        return _output_text(data)
+
+    async def _call_ollama_chat(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Call Ollama's native /api/chat endpoint (non-streaming)."""
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        payload = {
+            "model": self.config.model,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": self.config.keep_alive,
+            "options": {
+                "temperature": self.config.temperature,
+                "num_predict": max_tokens or self.config.max_tokens,
+            },
+        }
+        if self.config.reasoning_effort == "none":
+            payload["think"] = False
+        if json_schema is not None:
+            payload["format"] = json_schema
+        response = await self.client.post(f"{self.config.base_url}/api/chat", json=payload)
+        response.raise_for_status()
+        data = _json_loads(response.content)
+        self._record_usage({
+            "input_tokens": data.get("prompt_eval_count"),
+            "output_tokens": data.get("eval_count"),
+        })
+        return data["message"]["content"]
+
+    async def _call_responses_stream(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop_after: str = "{",
+        system: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Stream from /v1/responses and stop once the first JSON value is complete.
+
+        Models often keep generating after closing the JSON (explanations,
+        trailing notes); closing the stream there saves those tokens.
+
+        Args:
+            prompt: Prompt text
+            max_tokens: Output token budget (default: config.max_tokens)
+            stop_after: "{" to stop after the first object, "[" after the first array
+            system: Optional system message sent before the prompt
+            json_schema: Schema to constrain the output to, if any
+        """
+        payload = self._responses_payload(prompt, max_tokens, system, json_schema)
+        payload["stream"] = True
+        closer = "}" if stop_after == "{" else "]"
+
+        async with self.client.stream(
+            "POST",
+            f"{self.config.base_url}/v1/responses",
+            json=payload,
+        ) as response:
+            response.raise_for_status()
+
+            # Server ignored "stream"; it sent the whole response as JSON
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                data = _json_loads(await response.aread())
+                self._record_usage(data.get("usage"))
+                return _output_text(data)
+
+            parts: List[str] = []
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                event = _json_loads(data)
+                event_type = event.get("type")
+                if event_type == "response.output_text.delta":
+                    delta = event.get("delta", "")
+                    parts.append(delta)
+                    if closer in delta:
+                        text = "".join(parts)
+                        if _extract_first_json(text, stop_after) is not None:
+                            # Leaving the block closes the stream
+                            return text
+                elif event_type == "response.completed":
+                    self._record_usage(event.get("response", {}).get("usage"))
+                    if not parts:
+                        parts.append(_output_text(event.get("response", {})))
+                    break
+                elif event_type in ("response.failed", "error"):
+                    raise ValueError(f"LLM stream error: {data[:500]}")
+
+        return "".join(parts)
 
     async def _call_responses_with_reasoning(self, prompt: str) -> dict:
         """
@@ -149,20 +738,12 @@ class LLMEnricher:
         Returns:
             dict with 'reasoning' (str or None) and 'output' (str) keys
         """
-        payload = {
-            "model": self.config.model,
-            "input": prompt,
-            "temperature": self.config.temperature,
-            "max_output_tokens": self.config.max_tokens,
-        }
-        if self.config.reasoning_effort is not None:
-            payload["reasoning"] = {"effort": self.config.reasoning_effort}
         response = await self.client.post(
             f"{self.config.base_url}/v1/responses",
-            json=payload,
+            json=self._responses_payload(prompt),
         )
         response.raise_for_status()
-        data = response.json()
+        data = _json_loads(response.content)
 
         reasoning_text = None
         output_text = None
@@ -184,57 +765,118 @@ class LLMEnricher:
         if output_text is None:
             raise ValueError(f"Could not extract output from responses API: {data}")
 
+        self._record_usage(data.get("usage"))
+
         return {
             "reasoning": reasoning_text,
             "output": output_text,
             "usage": data.get("usage", {})
         }
 
-    async def generate(self, prompt: str) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        stop_after_json: Optional[str] = None,
+        system: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Generate text using configured LLM with retry logic and circuit breaker.
 
+        Responses are cached by (provider, model, temperature, max_tokens,
+        reasoning effort, system, schema, prompt), so a repeated prompt skips the LLM
+        entirely. Empty responses, and ones without a parseable JSON value when
+        stop_after_json is set, are not cached.
+
+        Args:
+            prompt: Prompt text
+            max_tokens: Output token budget (default: config.max_tokens)
+            stop_after_json: "{" or "[" when the caller only needs the first
+                JSON object/array; with config.stream the response is cut
+                off as soon as it is complete
+            system: Invariant instructions sent as a system message ahead of
+                the prompt
+            json_schema: Schema the JSON output must follow; sent to the
+                server only with config.structured_output
+
         Raises:
             LLMUnavailableError: If LLM is unavailable (circuit breaker open)
             Exception: On persistent failure after retries
         """
-        # Circuit breaker check
-        if self._consecutive_failures >= self._max_consecutive_failures:
-            logger.warning(f"LLM circuit breaker OPEN ({self._consecutive_failures} consecutive failures)")
-            raise LLMUnavailableError("LLM unavailable - circuit breaker open")
-
+        if not self.config.structured_output:
+            json_schema = None
+
+        cache_key = None
+        if self._response_cache is not None:
+            cache_key = PromptCache.make_key(
+                self.config.provider,
+                self.config.model,
+                str(self.config.temperature),
+                str(max_tokens or self.config.max_tokens),
+                self.config.reasoning_effort or "",
+                system or "",
+                json.dumps(json_schema, sort_keys=True) if json_schema is not None else "",
+                prompt,
+            )
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self.stats.cache_hits += 1
+                return cached
+
+        probe = self._enter_circuit()
+        attempts = 1 if probe else self.config.max_retries + 1
         last_error = None
 
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                result = await self._call_responses(prompt)
-
-                # Success - reset failure counter
-                self._consecutive_failures = 0
-                return result
-
-            except httpx.TimeoutException as e:
-                last_error = e
-                self._consecutive_failures += 1
-                logger.warning(f"LLM timeout (attempt {attempt + 1}/{self.config.max_retries + 1}): {e}")
-                if attempt < self.config.max_retries:
-                    await asyncio.sleep(1.0 * (attempt + 1))  # Backoff
-
-            except httpx.HTTPStatusError as e:
-                last_error = e
-                self._consecutive_failures += 1
-                logger.warning(f"LLM HTTP error {e.response.status_code} (attempt {attempt + 1}): {e}")
-                if e.response.status_code >= 500 and attempt < self.config.max_retries:
-                    await asyncio.sleep(1.0 * (attempt + 1))
-                else:
-                    break  # Client error, don't retry
-
-            except Exception as e:
-                last_error = e
-                self._consecutive_failures += 1
-                logger.error(f"LLM call failed (attempt {attempt + 1}): {e}")
-                if attempt < self.config.max_retries:
-                    await asyncio.sleep(1.0 * (attempt + 1))
+        try:
+            for attempt in range(attempts):
+                try:
+                    if self.config.ollama_native:
+                        result = await self._timed("generate", self._call_ollama_chat(
+                            prompt, max_tokens, system, json_schema
+                        ))
+                    elif stop_after_json and self.config.stream:
+                        result = await self._timed("generate", self._call_responses_stream(
+                            prompt, max_tokens, stop_after_json, system, json_schema
+                        ))
+                    else:
+                        result = await self._timed(
+                            "generate", self._call_responses(prompt, max_tokens, system, json_schema)
+                        )
+
+                    # Success - close the circuit breaker
+                    self._record_success()
+                    # Only cache answers a caller can use: a truncated or
+                    # malformed one would otherwise be replayed on every run
+                    if cache_key is not None and _is_usable_response(result, stop_after_json):
+                        self._response_cache.put(cache_key, result)
+                    return result
+
+                except httpx.TimeoutException as e:
+                    last_error = e
+                    self._record_failure()
+                    logger.warning(f"LLM timeout (attempt {attempt + 1}/{attempts}): {e}")
+                    if attempt < attempts - 1:
+                        await asyncio.sleep(self._backoff_delay(attempt))
+
+                except httpx.HTTPStatusError as e:
+                    last_error = e
+                    self._record_failure()
+                    logger.warning(f"LLM HTTP error {e.response.status_code} (attempt {attempt + 1}): {e}")
+                    if e.response.status_code >= 500 and attempt < attempts - 1:
+                        await asyncio.sleep(self._backoff_delay(attempt))
+                    else:
+                        break  # Client error, don't retry
+
+                except Exception as e:
+                    last_error = e
+                    self._record_failure()
+                    logger.error(f"LLM call failed (attempt {attempt + 1}): {e}")
+                    if attempt < attempts - 1:
+                        await asyncio.sleep(self._backoff_delay(attempt))
+        finally:
+            if probe:
+                self._probe_in_flight = False
 
         raise last_error or Exception("LLM call failed")
 
@@ -248,36 +890,69 @@ class LLMEnricher:
         Returns:
             dict with 'reasoning' (str or None), 'output' (str), 'usage' (dict)
         """
-        # Circuit breaker check
-        if self._consecutive_failures >= self._max_consecutive_failures:
-            raise LLMUnavailableError("LLM unavailable - circuit breaker open")
-
+        probe = self._enter_circuit()
+        attempts = 1 if probe else self.config.max_retries + 1
         last_error = None
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                result = await self._call_responses_with_reasoning(prompt)
-                self._consecutive_failures = 0
-                return result
 
-            except httpx.HTTPStatusError as e:
-                last_error = e
-                self._consecutive_failures += 1
-                logger.warning(f"LLM HTTP error {e.response.status_code} (attempt {attempt + 1}): {e}")
-                if e.response.status_code >= 500:
-                    if attempt < self.config.max_retries:
-                        await asyncio.sleep(1.0 * (attempt + 1))
-                else:
-                    break
+        try:
+            for attempt in range(attempts):
+                try:
+                    result = await self._timed(
+                        "generate_with_reasoning", self._call_responses_with_reasoning(prompt)
+                    )
+                    self._record_success()
+                    return result
+
+                except httpx.HTTPStatusError as e:
+                    last_error = e
+                    self._record_failure()
+                    logger.warning(f"LLM HTTP error {e.response.status_code} (attempt {attempt + 1}): {e}")
+                    if e.response.status_code >= 500:
+                        if attempt < attempts - 1:
+                            await asyncio.sleep(self._backoff_delay(attempt))
+                    else:
+                        break
 
-            except Exception as e:
-                last_error = e
-                self._consecutive_failures += 1
-                logger.error(f"LLM call failed (attempt {attempt + 1}): {e}")
-                if attempt < self.config.max_retries:
-                    await asyncio.sleep(1.0 * (attempt + 1))
+                except Exception as e:
+                    last_error = e
+                    self._record_failure()
+                    logger.error(f"LLM call failed (attempt {attempt + 1}): {e}")
+                    if attempt < attempts - 1:
+                        await asyncio.sleep(self._backoff_delay(attempt))
+        finally:
+            if probe:
+                self._probe_in_flight = False
 
         raise last_error or Exception("LLM call failed")
 
+    async def _semantic_lookup(
+        self,
+        kind: str,
+        text: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look up a cached enrichment for code similar to text.
+
+        Args:
+            kind: "file", "symbol", "file_summary" or "symbol_summary"
+            text: Code (with its path and name) to embed as the key
+
+        Returns:
+            (cached value or None, embedding to store the new value under)
+        """
+        cache = self._semantic_caches.get(kind)
+        if cache is None or self.embedder is None:
+            return None, None
+        embedding = await asyncio.to_thread(self.embedder.generate_embedding, text)
+        return cache.get(embedding), embedding
+
+    def _semantic_store(
+        self, kind: str, embedding: Optional[List[float]], value: Dict[str, Any]
+    ) -> None:
+        """Remember a successful enrichment for later near-duplicates."""
+        if embedding is not None:
+            self._semantic_caches[kind].put(embedding, value)
+
     async def enrich_file(
         self,
         file_path: str,
@@ -295,50 +970,43 @@ class LLMEnricher:
         Returns:
             EnrichmentResult with summary, purpose, etc.
         """
+        trivial = _trivial_enrichment(file_path, content, language)
+        if trivial is not None:
+            self.trivial_skipped += 1
+            logger.debug(f"Skipping LLM for trivial file {file_path}")
+            return trivial
+
         # Truncate content if too long for context window
-        max_content = 6000
-        truncated = content[:max_content] if len(content) > max_content else content
-        was_truncated = len(content) > max_content
+        truncated = content[:_MAX_FILE_CHARS]
+        truncation_note = _TRUNCATION_NOTE if len(content) > _MAX_FILE_CHARS else ""
+
+        cached, embedding = await self._semantic_lookup(
+            "file", f"File: {file_path}\n{truncated}"
+        )
+        if cached is not None:
+            return EnrichmentResult(**cached)
 
         prompt = f"""Analyze this {language} file and provide a structured summary.
 
 File: {file_path}
-{"(Content truncated to first 6000 chars)" if was_truncated else ""}
+{truncation_note}
 
 ```{language}
 {truncated}
-```
-
-Provide your analysis in this exact JSON format (no markdown, just JSON):
-{{
-    "summary": "2-3 sentence description of what this file does",
-    "purpose": "Why does this file exist? What problem does it solve?",
-    "key_symbols": [
-        {{"name": "SymbolName", "type": "class|function|constant", "purpose": "What it does"}}
-    ],
-    "usage_pattern": "How would a developer typically use this file/module?",
-    "integrations": ["list", "of", "modules", "this", "connects", "to"],
-    "quality_notes": "Any issues noticed (missing docstrings, complexity, etc.) or null"
-}}
-
-Respond with only valid JSON, no explanation."""
+```"""
 
         try:
-            response = await self.generate(prompt)
+            response = await self.generate(
+                prompt, stop_after_json="{", system=SYSTEM_PROMPT_FILE, json_schema=ENRICHMENT_SCHEMA
+            )
 
             # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                data = json.loads(json_match.group())
-                return EnrichmentResult(
-                    summary=data.get("summary", ""),
-                    purpose=data.get("purpose", ""),
-                    key_symbols=data.get("key_symbols", []),
-                    usage_pattern=data.get("usage_pattern"),
-                    integrations=data.get("integrations", []),
-                    quality_notes=data.get("quality_notes"),
-                    raw_response=response
-                )
+            json_text = _extract_first_json(response)
+            if json_text:
+                data = _json_loads(json_text)
+                result = _enrichment_from_json(data, response)
+                self._semantic_store("file", embedding, asdict(result))
+                return result
             else:
                 logger.warning(f"Could not parse JSON from LLM response for {file_path}")
                 return EnrichmentResult(
@@ -376,8 +1044,21 @@ Respond with only valid JSON, no explanation."""
         Returns:
             EnrichmentResult with summary and usage info
         """
+        enricher = self.for_code(code)
+        if enricher is not self:
+            return await enricher.enrich_symbol(
+                symbol_name, symbol_type, code, file_path, language
+            )
+
         max_code = 4000
-        truncated = code[:max_code] if len(code) > max_code else code
+        truncated = code[:max_code]
+
+        cached, embedding = await self._semantic_lookup(
+            "symbol",
+            _symbol_cache_text(symbol_name, symbol_type, file_path, truncated)
+        )
+        if cached is not None:
+            return EnrichmentResult(**cached)
 
         prompt = f"""Analyze this {language} {symbol_type} and explain how to use it.
 
@@ -386,37 +1067,19 @@ File: {file_path}
 
 ```{language}
 {truncated}
-```
-
-Provide your analysis in this exact JSON format:
-{{
-    "summary": "1-2 sentence description of what this {symbol_type} does",
-    "purpose": "When would a developer use this?",
-    "key_symbols": [
-        {{"name": "method_name", "type": "method", "purpose": "What it does"}}
-    ],
-    "usage_pattern": "Example of how to use this (code snippet or description)",
-    "integrations": ["what", "this", "connects", "to"],
-    "quality_notes": "Any issues or null"
-}}
-
-Respond with only valid JSON."""
+```"""
 
         try:
-            response = await self.generate(prompt)
-
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                data = json.loads(json_match.group())
-                return EnrichmentResult(
-                    summary=data.get("summary", ""),
-                    purpose=data.get("purpose", ""),
-                    key_symbols=data.get("key_symbols", []),
-                    usage_pattern=data.get("usage_pattern"),
-                    integrations=data.get("integrations", []),
-                    quality_notes=data.get("quality_notes"),
-                    raw_response=response
-                )
+            response = await self.generate(
+                prompt, stop_after_json="{", system=SYSTEM_PROMPT_SYMBOL, json_schema=ENRICHMENT_SCHEMA
+            )
+
+            json_text = _extract_first_json(response)
+            if json_text:
+                data = _json_loads(json_text)
+                result = _enrichment_from_json(data, response)
+                self._semantic_store("symbol", embedding, asdict(result))
+                return result
             else:
                 return EnrichmentResult(
                     summary=response[:300],
@@ -449,17 +1112,14 @@ Respond with only valid JSON."""
         Returns:
             Markdown summary of the repository
         """
-        # Identify key directories
-        dirs = set()
-        for f in file_list:
-            parts = Path(f).parts
-            if len(parts) > 1:
-                dirs.add(parts[0])
+        # Identify key directories (plain string split; no Path per file)
+        dirs = {f.split("/", 1)[0] for f in file_list if "/" in f}
 
         # Build prompt with sample files
-        samples_text = ""
-        for path, content in list(sample_files.items())[:5]:
-            samples_text += f"\n### {path}\n```\n{content[:1000]}\n```\n"
+        samples_text = "".join(
+            f"\n### {path}\n```\n{content[:1000]}\n```\n"
+            for path, content in islice(sample_files.items(), 5)
+        )
 
         prompt = f"""Analyze this code repository and create a comprehensive summary.
 
@@ -499,9 +1159,10 @@ Write clear, concise documentation (300-500 words)."""
             Markdown summary of the module
         """
         # Build content sample
-        content_sample = ""
-        for path, content in key_file_contents.items():
-            content_sample += f"\n### {path}\n```\n{content[:1500]}\n```\n"
+        content_sample = "".join(
+            f"\n### {path}\n```\n{content[:1500]}\n```\n"
+            for path, content in key_file_contents.items()
+        )
 
         prompt = f"""Analyze this code module/package and create a summary.
 
@@ -522,10 +1183,16 @@ Write clear documentation (150-300 words)."""
         return await self.generate(prompt)
 
     async def close(self):
-        """Close HTTP client"""
+        """Close HTTP client and response cache"""
         if self._client is not None:
             await self._client.aclose()
             self._client = None
+        if self._response_cache is not None:
+            self._response_cache.close()
+        for cache in self._semantic_caches.values():
+            cache.close()
+        if self._small is not None:
+            await self._small.close()
 
 
 async def test_enricher():
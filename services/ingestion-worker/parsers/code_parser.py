@@ -1,7 +1,9 @@
 import hashlib
+import re
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 from loguru import logger
 import git
@@ -18,6 +20,22 @@ from config import WorkerConfig
 
 config = WorkerConfig()
 
+# should_skip_file patterns, built once: each check is one C-level scan
+# instead of a Python loop over the pattern list
+_SKIP_SUFFIXES = ('.min.js', '.min.css', '.map', '.pb.go', '.g.dart')
+_SKIP_NAME_RE = re.compile(r'bundle|vendor|chunk|runtime|generated|codegen')
+_LOCK_FILES = frozenset([
+    'package-lock.json', 'yarn.lock', 'Cargo.lock', 'poetry.lock',
+    'Pipfile.lock', 'Gemfile.lock', 'go.sum', 'pnpm-lock.yaml',
+])
+_BUILD_DIRS = ['node_modules', 'dist', 'build', '__pycache__', '.next',
+               'target', 'vendor', '.venv', 'venv', '.git', '.svn',
+               'staticfiles', 'static', 'assets/vendor', 'public/vendor']
+# A build dir as a whole path component, at the start of the path or after a /
+_BUILD_DIR_RE = re.compile(
+    r'(?:^|/)(?:' + '|'.join(re.escape(d) for d in _BUILD_DIRS) + r')/'
+)
+
 
 def should_skip_file(file_path: Path) -> bool:
     """
@@ -33,36 +51,21 @@ def should_skip_file(file_path: Path) -> bool:
     path_str = str(file_path)
     file_name = file_path.name
 
-    # Skip minified files by extension
-    if file_name.endswith('.min.js') or file_name.endswith('.min.css'):
-        return True
-
-    # Skip bundle files (often minified even without .min. extension)
-    if any(keyword in file_name.lower() for keyword in ['bundle', 'vendor', 'chunk', 'runtime']):
+    # Skip minified files, source maps, protocol buffer and generated code
+    if file_name.endswith(_SKIP_SUFFIXES):
         return True
 
-    # Skip source maps
-    if file_name.endswith('.map'):
+    # Skip bundle files (often minified even without .min. extension) and
+    # generated files
+    if _SKIP_NAME_RE.search(file_name.lower()):
         return True
 
     # Skip lock files (huge and not useful for search)
-    if file_name in ['package-lock.json', 'yarn.lock', 'Cargo.lock', 'poetry.lock',
-                     'Pipfile.lock', 'Gemfile.lock', 'go.sum', 'pnpm-lock.yaml']:
+    if file_name in _LOCK_FILES:
         return True
 
     # Skip build directories and static assets
-    build_dirs = ['node_modules', 'dist', 'build', '__pycache__', '.next',
-                  'target', 'vendor', '.venv', 'venv', '.git', '.svn',
-                  'staticfiles', 'static', 'assets/vendor', 'public/vendor']
-    if any(f'/{dir}/' in path_str or path_str.startswith(f'{dir}/') for dir in build_dirs):
-        return True
-
-    # Skip generated files
-    if 'generated' in file_name.lower() or 'codegen' in file_name.lower():
-        return True
-
-    # Skip protocol buffer and generated code
-    if file_name.endswith('.pb.go') or file_name.endswith('.g.dart'):
+    if _BUILD_DIR_RE.search(path_str):
         return True
 
     # Skip very large files (>500KB - likely minified/bundled)
@@ -127,7 +130,7 @@ class CodeChunk:
         self.language = language
         self.metadata = metadata
         self.embedding = None  # Will be populated by EmbeddingGenerator
-        self.created_at = datetime.utcnow().isoformat()
+        self.created_at = datetime.now(timezone.utc).isoformat()
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for storage
@@ -167,6 +170,11 @@ class CodeParser:
 
         # Initialize tree-sitter parsers
         self.parsers = {}
+        # Language objects, kept so worker threads can build their own Parser
+        # (a Parser instance must not be used from two threads at once)
+        self._languages = {}
+        self._thread_parsers = threading.local()
+        self._thread_parsers.parsers = self.parsers
 
         # Load individual tree-sitter language packages (tree-sitter 0.22+ API)
         try:
@@ -194,6 +202,7 @@ class CodeParser:
                     lang = Language(lang_func())
                     parser = Parser(lang)
                     self.parsers[lang_name] = parser
+                    self._languages[lang_name] = lang
                 except ImportError:
                     logger.debug(f"{module_name} not available, {lang_name} will use regex fallback")
                 except Exception as e:
@@ -207,6 +216,24 @@ class CodeParser:
 
         logger.info(f"✓ Parsers initialized: {list(self.parsers.keys()) if self.parsers else 'regex fallback mode'}")
 
+    def _get_parser(self, lang_name: str):
+        """
+        Tree-sitter parser for lang_name, owned by the calling thread.
+
+        The constructing thread uses the parsers built in __init__; any other
+        thread lazily gets its own, built once from the cached Language.
+        """
+        parsers = getattr(self._thread_parsers, "parsers", None)
+        if parsers is None:
+            parsers = self._thread_parsers.parsers = {}
+
+        parser = parsers.get(lang_name)
+        if parser is None:
+            from tree_sitter import Parser
+            parser = Parser(self._languages[lang_name])
+            parsers[lang_name] = parser
+        return parser
+
     def create_metadata_chunk(self, file_path: str, content: str, language: str, git_metadata: Dict, repo_id: str) -> CodeChunk:
         """
         Create a metadata chunk for the file.
@@ -355,6 +382,17 @@ class CodeParser:
         repo_id: str,
         relative_path: str,
         git_metadata: Dict
+    ) -> List[CodeChunk]:
+        """Async facade over parse_python_file_sync (parses on the calling thread)."""
+        return self.parse_python_file_sync(file_path, content, repo_id, relative_path, git_metadata)
+
+    def parse_python_file_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict
     ) -> List[CodeChunk]:
         """
         Parse a Python file into semantic chunks
@@ -377,7 +415,7 @@ class CodeParser:
                 logger.warning("Parser for python not found, using regex fallback")
                 return self._regex_parse_python(content, relative_path, repo_id, git_metadata)
 
-            parser = self.parsers["python"]
+            parser = self._get_parser("python")
             tree = parser.parse(bytes(content, "utf8"))
             root = tree.root_node
 
@@ -680,6 +718,21 @@ class CodeParser:
         relative_path: str,
         git_metadata: Dict,
         is_typescript: bool = False
+    ) -> List[CodeChunk]:
+        """Async facade over parse_javascript_file_sync (parses on the calling thread)."""
+        return self.parse_javascript_file_sync(
+            file_path, content, repo_id, relative_path, git_metadata,
+            is_typescript=is_typescript
+        )
+
+    def parse_javascript_file_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
+        is_typescript: bool = False
     ) -> List[CodeChunk]:
         """
         Parse a JavaScript/TypeScript file into semantic chunks
@@ -694,7 +747,7 @@ class CodeParser:
                 logger.warning(f"Parser for {parser_key} not found, using regex fallback")
                 return self._regex_parse_javascript(content, relative_path, repo_id, git_metadata, is_typescript)
 
-            parser = self.parsers[parser_key]
+            parser = self._get_parser(parser_key)
             tree = parser.parse(bytes(content, "utf8"))
             root = tree.root_node
 
@@ -809,6 +862,17 @@ class CodeParser:
         repo_id: str,
         relative_path: str,
         git_metadata: Dict,
+    ) -> List[CodeChunk]:
+        """Async facade over parse_java_file_sync (parses on the calling thread)."""
+        return self.parse_java_file_sync(file_path, content, repo_id, relative_path, git_metadata)
+
+    def parse_java_file_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
     ) -> List[CodeChunk]:
         """
         Parse a Java file into semantic chunks.
@@ -823,7 +887,7 @@ class CodeParser:
             return chunks
 
         try:
-            parser = self.parsers["java"]
+            parser = self._get_parser("java")
             tree = parser.parse(bytes(content, "utf8"))
             root = tree.root_node
 
@@ -916,6 +980,17 @@ class CodeParser:
         repo_id: str,
         relative_path: str,
         git_metadata: Dict,
+    ) -> List[CodeChunk]:
+        """Async facade over parse_swift_file_sync (parses on the calling thread)."""
+        return self.parse_swift_file_sync(file_path, content, repo_id, relative_path, git_metadata)
+
+    def parse_swift_file_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
     ) -> List[CodeChunk]:
         """
         Parse a Swift file into semantic chunks.
@@ -938,7 +1013,7 @@ class CodeParser:
             return chunks
 
         try:
-            parser = self.parsers["swift"]
+            parser = self._get_parser("swift")
             tree = parser.parse(bytes(content, "utf8"))
             root = tree.root_node
 
@@ -1068,6 +1143,17 @@ class CodeParser:
         repo_id: str,
         relative_path: str,
         git_metadata: Dict,
+    ) -> List[CodeChunk]:
+        """Async facade over parse_elixir_file_sync (parses on the calling thread)."""
+        return self.parse_elixir_file_sync(file_path, content, repo_id, relative_path, git_metadata)
+
+    def parse_elixir_file_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
     ) -> List[CodeChunk]:
         """
         Parse an Elixir file into semantic chunks.
@@ -1095,7 +1181,7 @@ class CodeParser:
         FUNC_CALLS = frozenset({"def", "defp", "defmacro", "defmacrop"})
 
         try:
-            parser = self.parsers["elixir"]
+            parser = self._get_parser("elixir")
             tree = parser.parse(bytes(content, "utf8"))
             root = tree.root_node
 
@@ -1258,6 +1344,17 @@ class CodeParser:
         repo_id: str,
         relative_path: str,
         git_metadata: Dict
+    ) -> List[CodeChunk]:
+        """Async facade over parse_svelte_file_sync (parses on the calling thread)."""
+        return self.parse_svelte_file_sync(file_path, content, repo_id, relative_path, git_metadata)
+
+    def parse_svelte_file_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict
     ) -> List[CodeChunk]:
         """
         Parse Svelte file by extracting script, template, and style sections
@@ -1284,7 +1381,7 @@ class CodeParser:
             if script_content:
                 # Parse script section as JS/TS
                 try:
-                    script_chunks = await self.parse_javascript_file(
+                    script_chunks = self.parse_javascript_file_sync(
                         file_path, script_content, repo_id, relative_path + " <script>",
                         git_metadata, is_typescript=is_typescript
                     )
@@ -5,7 +5,7 @@ Creates one document per unique commit for searchability and deduplication
 
 import hashlib
 from typing import Dict, List, Set
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
 from loguru import logger
@@ -40,7 +40,7 @@ class CommitChunk:
         self.author = author
         self.commit_message = commit_message
         self.files_changed = files_changed or []
-        self.created_at = datetime.utcnow().isoformat()
+        self.created_at = datetime.now(timezone.utc).isoformat()
 
         # Commits don't have embeddings by default
         # But you could embed commit messages for semantic search
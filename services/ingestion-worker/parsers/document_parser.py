@@ -2,33 +2,109 @@
 Document Parser for markdown, text, and configuration files
 """
 
+import asyncio
 import hashlib
 import json
+import os
+import re
+import subprocess
+import weakref
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from datetime import datetime
+from typing import Any, List, Dict, Optional, Tuple
+from datetime import datetime, timezone
 
 from loguru import logger
 import frontmatter
 import git
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from config import WorkerConfig
 from parsers.code_parser import should_skip_file
 
+# libyaml-backed loader when PyYAML was built with it (the PyPI wheels are)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 config = WorkerConfig()
 
+# One `git log` record per commit: \x1e, then NUL-separated hash, committer
+# date, author email and message; -z adds a NUL and --name-only the
+# NUL-separated paths the commit touched.
+_GIT_LOG_FORMAT = "%x1e%H%x00%cI%x00%ae%x00%B"
+
+# Markdown header line (# Header, ## Header, ...), indented or not
+_MD_HEADER_RE = re.compile(r'^[^\S\n]*(#{1,6})[^\S\n]+(\S[^\n]*)', re.MULTILINE)
+_MD_HASHTAG_RE = re.compile(r'#(\w+)')
+_MD_TITLE_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+
+# Characters an RST section underline may repeat, and the subset accepted
+# for the document title
+_RST_UNDERLINE = frozenset('=-`:\'"~^_*+#<>')
+_RST_TITLE_UNDERLINE = frozenset('=-#~^"')
+
+# Files orjson would read or write differently from the stdlib go through
+# the stdlib instead: 19+ digit runs may be integers beyond 64 bits, which
+# orjson reads as floats, and floats below 1e-4 are written with an exponent
+# that orjson doesn't zero-pad (1e-7 vs 1e-07). Strings that match only cost
+# the faster path.
+_STDLIB_JSON_RE = re.compile(r'\d{19,}|\d[eE]|0\.0000')
+
+# Suffixes parse_file has a parser for
+_PARSED_SUFFIXES = frozenset({".md", ".rst", ".json", ".yaml", ".yml", ".txt"})
+
+
+def _parse_json(content: str) -> Tuple[Any, str]:
+    """
+    Parse JSON text; return the data and a readable form of it.
+
+    Files that look indented already (most checked-in configs) are returned
+    as-is instead of being re-serialized: a newline followed by two spaces or
+    a tab within the first 200 characters is taken as the sign, so their own
+    indentation (4 spaces, tabs, ...) is kept and the rest of the file is not
+    checked. Anything else is re-serialized with 2-space indentation.
+    """
+    head = content[:200]
+    formatted = "\n  " in head or "\n\t" in head
+    if HAS_ORJSON and not _STDLIB_JSON_RE.search(content):
+        try:
+            data = orjson.loads(content)
+            if formatted:
+                return data, content
+            return data, orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which the stdlib accepts
+    data = json.loads(content)
+    if formatted:
+        return data, content
+    return data, json.dumps(data, indent=2, ensure_ascii=False)
+
 
 class DocumentChunk:
     """Represents a parsed document chunk"""
 
+    # Repositories produce tens of thousands of chunks; no per-instance dict
+    __slots__ = (
+        "chunk_id", "type", "repo_id", "file_path", "doc_type",
+        "content", "metadata", "embedding", "created_at",
+    )
+
     def __init__(
         self,
         repo_id: str,
         file_path: str,
         doc_type: str,
         content: str,
-        metadata: Dict
+        metadata: Dict,
+        created_at: Optional[str] = None
     ):
         # Generate deterministic chunk ID based on git commit and content
         # Documents are stored as whole files
@@ -49,7 +125,7 @@ class DocumentChunk:
         self.content = content
         self.metadata = metadata
         self.embedding = None  # Will be populated by EmbeddingGenerator
-        self.created_at = datetime.utcnow().isoformat()
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for storage
@@ -57,8 +133,10 @@ class DocumentChunk:
         Note: Removes commit_message from metadata before storage
         (commit messages are stored in separate CommitChunk documents)
         """
-        # Create a copy of metadata without commit_message
-        storage_metadata = {k: v for k, v in self.metadata.items() if k != "commit_message"}
+        # Create a copy of metadata without commit_message (C-level copy + pop
+        # rather than rebuilding the dict key by key)
+        storage_metadata = self.metadata.copy()
+        storage_metadata.pop("commit_message", None)
 
         return {
             "chunk_id": self.chunk_id,
@@ -73,6 +151,12 @@ class DocumentChunk:
         }
 
 
+def _close_repos(repo_cache: Dict[Path, git.Repo]) -> None:
+    for repo in repo_cache.values():
+        repo.close()
+    repo_cache.clear()
+
+
 class DocumentParser:
     """
     Parses documentation files (markdown, text, JSON, YAML)
@@ -81,6 +165,24 @@ class DocumentParser:
     def __init__(self):
         """Initialize document parser"""
         logger.info("Initializing document parser")
+        # Opened once per repository: git.Repo() re-reads refs and config.
+        # Each keeps git cat-file processes open until close(), or until the
+        # parser is garbage collected if the owner never closes it.
+        self._repo_cache: Dict[Path, git.Repo] = {}
+        weakref.finalize(self, _close_repos, self._repo_cache)
+
+    def close(self) -> None:
+        """
+        Release cached git.Repo handles and their git subprocesses. The
+        parser stays usable; later lookups open the repositories again.
+        """
+        _close_repos(self._repo_cache)
+
+    def __enter__(self) -> "DocumentParser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def get_git_metadata(self, repo_path: Path, file_path: str) -> Dict:
         """
@@ -95,7 +197,9 @@ class DocumentParser:
             Dictionary with commit information (message kept for CommitParser extraction)
         """
         try:
-            repo = git.Repo(repo_path)
+            repo = self._repo_cache.get(repo_path)
+            if repo is None:
+                repo = self._repo_cache[repo_path] = git.Repo(repo_path)
 
             # Get the latest commit that modified this file
             commits = list(repo.iter_commits(paths=file_path, max_count=1))
@@ -115,6 +219,58 @@ class DocumentParser:
 
         return {}
 
+    def _build_git_metadata_index(self, repo_path: Path) -> Dict[str, Dict]:
+        """
+        Map every path in HEAD's history to its latest commit's metadata.
+
+        One `git log` over the whole history replaces a per-file
+        get_git_metadata() call (a `git log -- <path>` subprocess each).
+        Commits come newest first, so the first one seen for a path wins.
+
+        Args:
+            repo_path: Path to the repository
+
+        Returns:
+            Dictionary of relative path -> get_git_metadata()-style dict;
+            empty if the history can't be read
+        """
+        index: Dict[str, Dict] = {}
+        try:
+            result = subprocess.run(
+                ["git", "log", "--name-only", "-z", f"--format={_GIT_LOG_FORMAT}", "HEAD"],
+                cwd=repo_path,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=300
+            )
+            if result.returncode != 0:
+                logger.warning(f"Could not read git history for {repo_path}: {result.stderr.strip()}")
+                return index
+
+            for record in result.stdout.split("\x1e"):
+                fields = record.split("\0")
+                if len(fields) < 4:
+                    continue
+                commit_hash, commit_date, author, message = fields[:4]
+                metadata = {
+                    "commit_hash": commit_hash,
+                    "commit_date": commit_date,
+                    "author": author,
+                    # Note: commit_message kept temporarily for CommitParser extraction
+                    # Removed before storage in to_dict()
+                    "commit_message": message.strip()
+                }
+                for path in fields[4:]:
+                    path = path.lstrip("\n")
+                    if path and path not in index:
+                        index[path] = metadata
+        except Exception as e:
+            logger.warning(f"Could not read git history for {repo_path}: {e}")
+
+        return index
+
     def split_markdown_by_headers(self, content: str) -> List[tuple]:
         """
         Split markdown content by headers (# ## ### etc.)
@@ -122,38 +278,23 @@ class DocumentParser:
         Returns:
             List of (header_text, section_content, header_level) tuples
         """
-        import re
-
-        lines = content.splitlines(keepends=True)
         sections = []
-        current_header = None
-        current_header_level = 0
-        current_section_lines = []
-
-        # Regex for markdown headers: # Header, ## Header, etc.
-        header_pattern = re.compile(r'^(#{1,6})\s+(.+)$')
-
-        for line in lines:
-            match = header_pattern.match(line.strip())
-
-            if match:
-                # Save previous section if exists
-                if current_header is not None or current_section_lines:
-                    section_content = ''.join(current_section_lines)
-                    sections.append((current_header, section_content, current_header_level))
-
-                # Start new section
-                current_header_level = len(match.group(1))  # Count # characters
-                current_header = match.group(2).strip()
-                current_section_lines = [line]  # Include the header line
-            else:
-                # Add line to current section
-                current_section_lines.append(line)
+        # Each section runs from its header line to the next header; text
+        # before the first header is a section with no header
+        prev_start = 0
+        prev_header = None
+        prev_level = 0
+
+        for match in _MD_HEADER_RE.finditer(content):
+            if prev_header is not None or match.start() > prev_start:
+                sections.append((prev_header, content[prev_start:match.start()], prev_level))
+            prev_start = match.start()
+            prev_header = match.group(2).strip()
+            prev_level = len(match.group(1))  # Count # characters
 
         # Don't forget the last section
-        if current_header is not None or current_section_lines:
-            section_content = ''.join(current_section_lines)
-            sections.append((current_header, section_content, current_header_level))
+        if prev_header is not None or prev_start < len(content):
+            sections.append((prev_header, content[prev_start:], prev_level))
 
         return sections
 
@@ -163,7 +304,22 @@ class DocumentParser:
         content: str,
         repo_id: str,
         relative_path: str,
-        git_metadata: Dict
+        git_metadata: Dict,
+        created_at: Optional[str] = None
+    ) -> List[DocumentChunk]:
+        """Async facade over parse_markdown_sync (parses on the calling thread)."""
+        return self.parse_markdown_sync(
+            file_path, content, repo_id, relative_path, git_metadata, created_at
+        )
+
+    def parse_markdown_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
+        created_at: Optional[str] = None
     ) -> List[DocumentChunk]:
         """
         Parse a markdown file, extracting frontmatter and content
@@ -183,8 +339,15 @@ class DocumentParser:
         chunks = []
 
         try:
-            # Parse frontmatter if present
-            post = frontmatter.loads(content)
+            # Parse frontmatter if present. Most files have none; only text
+            # that could open with a delimiter (YAML ---, TOML +++, JSON { or })
+            # goes through the handler detection, the rest is wrapped as-is
+            # (frontmatter.loads strips it either way).
+            stripped = content.strip()
+            if stripped[:1] in ("-", "+", "{", "}"):
+                post = frontmatter.loads(content)
+            else:
+                post = frontmatter.Post(stripped)
 
             # Extract hashtags from frontmatter or content
             hashtags = []
@@ -194,14 +357,13 @@ class DocumentParser:
                 hashtags = post.metadata.get("hashtags", [])
 
             # Simple hashtag extraction from content (but not from headers)
-            import re
-            content_hashtags = re.findall(r'#(\w+)', post.content)
+            content_hashtags = _MD_HASHTAG_RE.findall(post.content)
             hashtags.extend(content_hashtags)
-            hashtags = list(set(hashtags))  # Remove duplicates
+            hashtags = list(dict.fromkeys(hashtags))  # Remove duplicates, keep first-seen order
 
             # Extract document title (first # header)
             doc_title = None
-            title_match = re.search(r'^#\s+(.+)$', post.content, re.MULTILINE)
+            title_match = _MD_TITLE_RE.search(post.content)
             if title_match:
                 doc_title = title_match.group(1).strip()
 
@@ -224,7 +386,8 @@ class DocumentParser:
                     file_path=relative_path,
                     doc_type="markdown",
                     content=post.content,
-                    metadata=metadata
+                    metadata=metadata,
+                    created_at=created_at
                 ))
 
             else:
@@ -265,7 +428,8 @@ class DocumentParser:
                         file_path=relative_path,
                         doc_type="markdown",
                         content=section_content.strip(),
-                        metadata=metadata
+                        metadata=metadata,
+                        created_at=created_at
                     ))
 
         except Exception as e:
@@ -279,14 +443,29 @@ class DocumentParser:
         content: str,
         repo_id: str,
         relative_path: str,
-        git_metadata: Dict
+        git_metadata: Dict,
+        created_at: Optional[str] = None
+    ) -> List[DocumentChunk]:
+        """Async facade over parse_json_sync (parses on the calling thread)."""
+        return self.parse_json_sync(
+            file_path, content, repo_id, relative_path, git_metadata, created_at
+        )
+
+    def parse_json_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
+        created_at: Optional[str] = None
     ) -> List[DocumentChunk]:
         """Parse a JSON file"""
         chunks = []
 
         try:
             # Parse JSON
-            data = json.loads(content)
+            data, formatted_content = _parse_json(content)
 
             metadata = {
                 "format": "json",
@@ -295,15 +474,13 @@ class DocumentParser:
                 **git_metadata
             }
 
-            # Store pretty-printed JSON as content
-            formatted_content = json.dumps(data, indent=2)
-
             chunks.append(DocumentChunk(
                 repo_id=repo_id,
                 file_path=relative_path,
                 doc_type="json",
                 content=formatted_content,
-                metadata=metadata
+                metadata=metadata,
+                created_at=created_at
             ))
 
         except Exception as e:
@@ -317,14 +494,29 @@ class DocumentParser:
         content: str,
         repo_id: str,
         relative_path: str,
-        git_metadata: Dict
+        git_metadata: Dict,
+        created_at: Optional[str] = None
+    ) -> List[DocumentChunk]:
+        """Async facade over parse_yaml_sync (parses on the calling thread)."""
+        return self.parse_yaml_sync(
+            file_path, content, repo_id, relative_path, git_metadata, created_at
+        )
+
+    def parse_yaml_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
+        created_at: Optional[str] = None
     ) -> List[DocumentChunk]:
         """Parse a YAML file"""
         chunks = []
 
         try:
             # Parse YAML
-            data = yaml.safe_load(content)
+            data = yaml.load(content, Loader=_YamlLoader)
 
             metadata = {
                 "format": "yaml",
@@ -338,7 +530,8 @@ class DocumentParser:
                 file_path=relative_path,
                 doc_type="yaml",
                 content=content,
-                metadata=metadata
+                metadata=metadata,
+                created_at=created_at
             ))
 
         except Exception as e:
@@ -352,7 +545,22 @@ class DocumentParser:
         content: str,
         repo_id: str,
         relative_path: str,
-        git_metadata: Dict
+        git_metadata: Dict,
+        created_at: Optional[str] = None
+    ) -> List[DocumentChunk]:
+        """Async facade over parse_text_sync (parses on the calling thread)."""
+        return self.parse_text_sync(
+            file_path, content, repo_id, relative_path, git_metadata, created_at
+        )
+
+    def parse_text_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
+        created_at: Optional[str] = None
     ) -> List[DocumentChunk]:
         """Parse a plain text file"""
         chunks = []
@@ -370,7 +578,8 @@ class DocumentParser:
                 file_path=relative_path,
                 doc_type="text",
                 content=content,
-                metadata=metadata
+                metadata=metadata,
+                created_at=created_at
             ))
 
         except Exception as e:
@@ -396,13 +605,12 @@ class DocumentParser:
 
             # Check if next line is an underline (section header)
             if i + 1 < len(lines):
-                next_line = lines[i + 1]
-                underline_chars = set(next_line.strip())
+                underline = lines[i + 1].strip()
 
                 # Valid RST underline: single char repeated, common chars: = - ` : ' " ~ ^ _ * + # < >
-                if (len(underline_chars) == 1 and
-                    list(underline_chars)[0] in '=-`:\'"~^_*+#<>' and
-                    len(next_line.strip()) >= 3 and
+                if (len(underline) >= 3 and
+                    underline[0] in _RST_UNDERLINE and
+                    underline.count(underline[0]) == len(underline) and
                     line.strip()):
 
                     # Save previous section if exists
@@ -433,7 +641,22 @@ class DocumentParser:
         content: str,
         repo_id: str,
         relative_path: str,
-        git_metadata: Dict
+        git_metadata: Dict,
+        created_at: Optional[str] = None
+    ) -> List[DocumentChunk]:
+        """Async facade over parse_rst_sync (parses on the calling thread)."""
+        return self.parse_rst_sync(
+            file_path, content, repo_id, relative_path, git_metadata, created_at
+        )
+
+    def parse_rst_sync(
+        self,
+        file_path: Path,
+        content: str,
+        repo_id: str,
+        relative_path: str,
+        git_metadata: Dict,
+        created_at: Optional[str] = None
     ) -> List[DocumentChunk]:
         """
         Parse a reStructuredText file
@@ -450,11 +673,13 @@ class DocumentParser:
             # Extract main document title (first header)
             doc_title = None
             for i in range(len(lines) - 1):
-                if lines[i].strip() and lines[i+1].strip():
-                    underline_chars = set(lines[i+1].strip())
-                    if len(underline_chars) == 1 and list(underline_chars)[0] in '=-#~^"':
-                        doc_title = lines[i].strip()
-                        break
+                underline = lines[i+1].strip()
+                if (underline and
+                    underline[0] in _RST_TITLE_UNDERLINE and
+                    underline.count(underline[0]) == len(underline) and
+                    lines[i].strip()):
+                    doc_title = lines[i].strip()
+                    break
 
             # Check file size and decide on chunking strategy
             if len(content) <= 6000:
@@ -474,7 +699,8 @@ class DocumentParser:
                     file_path=relative_path,
                     doc_type="rst",
                     content=content,
-                    metadata=metadata
+                    metadata=metadata,
+                    created_at=created_at
                 ))
 
             else:
@@ -507,7 +733,8 @@ class DocumentParser:
                         file_path=relative_path,
                         doc_type="rst",
                         content=section_content.strip(),
-                        metadata=metadata
+                        metadata=metadata,
+                        created_at=created_at
                     ))
 
         except Exception as e:
@@ -519,7 +746,20 @@ class DocumentParser:
         self,
         file_path: Path,
         repo_path: Path,
-        repo_id: str
+        repo_id: str,
+        git_index: Optional[Dict[str, Dict]] = None,
+        created_at: Optional[str] = None
+    ) -> List[DocumentChunk]:
+        """Async facade over parse_file_sync (parses on the calling thread)."""
+        return self.parse_file_sync(file_path, repo_path, repo_id, git_index, created_at)
+
+    def parse_file_sync(
+        self,
+        file_path: Path,
+        repo_path: Path,
+        repo_id: str,
+        git_index: Optional[Dict[str, Dict]] = None,
+        created_at: Optional[str] = None
     ) -> List[DocumentChunk]:
         """
         Parse a document file
@@ -528,34 +768,56 @@ class DocumentParser:
             file_path: Path to the file
             repo_path: Path to the repository root
             repo_id: Repository identifier
+            git_index: Result of _build_git_metadata_index(); when None the
+                file's git metadata is looked up on its own
+            created_at: Timestamp for every chunk (None: each chunk stamps
+                its own)
 
         Returns:
             List of DocumentChunk objects
         """
+        # Config formats without a parser (.toml, .ini, ...) are never read
+        suffix = file_path.suffix.lower()
+        if suffix not in _PARSED_SUFFIXES:
+            return []
+
         try:
-            # Read file content
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            # Read file content: one bytes read and decode, with newlines
+            # normalized as text-mode open() would
+            content = file_path.read_bytes().decode("utf-8")
+            if "\r" in content:
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
 
             # Get relative path
             relative_path = str(file_path.relative_to(repo_path))
 
             # Get git metadata for this file
-            git_metadata = self.get_git_metadata(repo_path, relative_path)
+            if git_index is not None:
+                git_metadata = git_index.get(relative_path, {})
+            else:
+                git_metadata = self.get_git_metadata(repo_path, relative_path)
 
             # Determine file type and parse accordingly
-            suffix = file_path.suffix.lower()
-
             if suffix == ".md":
-                return await self.parse_markdown(file_path, content, repo_id, relative_path, git_metadata)
+                return self.parse_markdown_sync(
+                    file_path, content, repo_id, relative_path, git_metadata, created_at
+                )
             elif suffix == ".rst":
-                return await self.parse_rst(file_path, content, repo_id, relative_path, git_metadata)
+                return self.parse_rst_sync(
+                    file_path, content, repo_id, relative_path, git_metadata, created_at
+                )
             elif suffix == ".json":
-                return await self.parse_json(file_path, content, repo_id, relative_path, git_metadata)
+                return self.parse_json_sync(
+                    file_path, content, repo_id, relative_path, git_metadata, created_at
+                )
             elif suffix in [".yaml", ".yml"]:
-                return await self.parse_yaml(file_path, content, repo_id, relative_path, git_metadata)
+                return self.parse_yaml_sync(
+                    file_path, content, repo_id, relative_path, git_metadata, created_at
+                )
             elif suffix == ".txt":
-                return await self.parse_text(file_path, content, repo_id, relative_path, git_metadata)
+                return self.parse_text_sync(
+                    file_path, content, repo_id, relative_path, git_metadata, created_at
+                )
 
         except Exception as e:
             logger.error(f"Error parsing document {file_path}: {e}")
@@ -581,16 +843,40 @@ class DocumentParser:
 
         logger.info(f"Parsing documents in repository: {repo_path}")
 
-        # Find all document files
-        for ext in config.supported_doc_extensions:
-            for file_path in repo_path.rglob(f"*{ext}"):
+        git_index = self._build_git_metadata_index(repo_path)
+
+        # Find all document files in one walk of the tree (rather than one
+        # rglob per extension), never descending into .git
+        extensions = tuple(config.supported_doc_extensions)
+        file_paths = []
+        for root, dirs, files in os.walk(repo_path):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            for name in files:
+                if not name.endswith(extensions):
+                    continue
+                file_path = Path(root) / name
                 # Skip junk files using comprehensive filter
                 if should_skip_file(file_path):
                     logger.debug(f"Skipping junk file: {file_path.name}")
                     continue
-
-                chunks = await self.parse_file(file_path, repo_path, repo_id)
-                all_chunks.extend(chunks)
+                file_paths.append(file_path)
+
+        # Files parse independently (git metadata comes from the prebuilt
+        # index), so fan them out over the parsing thread pool
+        # Every chunk of this pass shares one timestamp
+        created_at = datetime.now(timezone.utc).isoformat()
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=config.max_parsing_threads) as executor:
+            results = await asyncio.gather(*[
+                loop.run_in_executor(
+                    executor, self.parse_file_sync,
+                    file_path, repo_path, repo_id, git_index, created_at
+                )
+                for file_path in file_paths
+            ])
+
+        for chunks in results:
+            all_chunks.extend(chunks)
 
         logger.info(f"Parsed {len(all_chunks)} document chunks from {repo_path}")
         return all_chunks
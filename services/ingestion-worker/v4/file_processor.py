@@ -13,6 +13,8 @@ Flow:
 7. Return documents ready for embedding
 """
 
+import asyncio
+import hashlib
 import subprocess
 from pathlib import Path
 from typing import List, Tuple, Optional
@@ -30,7 +32,11 @@ from .quality import QualityTracker
 # Import LLM chunker
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from llm_chunker import LLMChunker, is_underchunked, SemanticChunk
+from llm_chunker import LLMChunker, is_underchunked_names, SemanticChunk
+
+# Longest symbol snippet any consumer reads: the LLM summary prompt takes the
+# first 4000 chars, the embedding text the first 2000
+MAX_SNIPPET_CHARS = 4000
 
 
 class FileProcessor:
@@ -68,6 +74,15 @@ class FileProcessor:
         else:
             self.llm_chunker = None
 
+        # Tree-sitter results keyed by content hash + language, so identical
+        # files (vendored copies, generated boilerplate) are parsed once.
+        # Cleared per repository by the pipeline to bound memory.
+        self._symbol_cache: dict[str, List[SymbolRef]] = {}
+
+    def clear_symbol_cache(self) -> None:
+        """Drop memoized tree-sitter results (call between repositories)."""
+        self._symbol_cache.clear()
+
     def get_file_at_commit(
         self,
         repo_path: Path,
@@ -101,18 +116,11 @@ class FileProcessor:
             if result.returncode == 0:
                 return result.stdout
 
-            # Try short hash
-            short_hash = commit_hash[:12]
-            result = subprocess.run(
-                ["git", "show", f"{short_hash}:{file_path}"],
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                timeout=10
+            # No short-hash retry: a prefix of a full SHA that git could not
+            # resolve fails the same way, just slower.
+            logger.debug(
+                f"git show failed for {file_path}@{commit_hash}: {result.stderr.strip()}"
             )
-            if result.returncode == 0:
-                return result.stdout
-
             return None
 
         except subprocess.TimeoutExpired:
@@ -167,37 +175,34 @@ class FileProcessor:
         if language not in ("python", "javascript", "typescript", "svelte", "java", "swift", "elixir"):
             return symbols
 
+        cache_key = hashlib.blake2b(content.encode(), digest_size=16).hexdigest() + ":" + language
+        cached = self._symbol_cache.get(cache_key)
+        if cached is not None:
+            # Fresh list: callers append LLM chunks to the returned symbols
+            return list(cached)
+
         # Create dummy Path for parser (it uses for metadata only)
         dummy_path = Path(file_path)
 
+        parse_sync = {
+            "python": self.code_parser.parse_python_file_sync,
+            "javascript": self.code_parser.parse_javascript_file_sync,
+            "typescript": self.code_parser.parse_javascript_file_sync,
+            "svelte": self.code_parser.parse_svelte_file_sync,
+            "java": self.code_parser.parse_java_file_sync,
+            "swift": self.code_parser.parse_swift_file_sync,
+            "elixir": self.code_parser.parse_elixir_file_sync,
+        }[language]
+        kwargs = {"is_typescript": True} if language == "typescript" else {}
+
         try:
-            if language == "python":
-                chunks = await self.code_parser.parse_python_file(
-                    dummy_path, content, "", file_path, {}
-                )
-            elif language in ("javascript", "typescript"):
-                chunks = await self.code_parser.parse_javascript_file(
-                    dummy_path, content, "", file_path, {},
-                    is_typescript=(language == "typescript")
-                )
-            elif language == "svelte":
-                chunks = await self.code_parser.parse_svelte_file(
-                    dummy_path, content, "", file_path, {}
-                )
-            elif language == "java":
-                chunks = await self.code_parser.parse_java_file(
-                    dummy_path, content, "", file_path, {}
-                )
-            elif language == "swift":
-                chunks = await self.code_parser.parse_swift_file(
-                    dummy_path, content, "", file_path, {}
-                )
-            elif language == "elixir":
-                chunks = await self.code_parser.parse_elixir_file(
-                    dummy_path, content, "", file_path, {}
-                )
-            else:
-                return symbols
+            # Parsing is CPU-bound and mostly holds the GIL (the tree walk is
+            # Python), so a worker thread buys little parallelism; it keeps
+            # the event loop free for in-flight LLM calls while a file parses
+            # (CodeParser keeps one Parser per thread)
+            chunks = await asyncio.to_thread(
+                parse_sync, dummy_path, content, "", file_path, {}, **kwargs
+            )
 
             for chunk in chunks:
                 name = self.extract_symbol_name(chunk.metadata, chunk.chunk_type)
@@ -212,7 +217,9 @@ class FileProcessor:
 
         except Exception as e:
             logger.debug(f"Symbol extraction failed for {file_path}: {e}")
+            return symbols
 
+        self._symbol_cache[cache_key] = list(symbols)
         return symbols
 
     def extract_imports(self, content: str, language: str) -> List[str]:
@@ -324,17 +331,47 @@ class FileProcessor:
             self.quality_tracker.record_llm_call(success=False)
             return []
 
+    def get_line_offsets(self, content: str) -> List[int]:
+        """
+        Start offset of every line in content, plus a sentinel one past the end.
+
+        Computed once per file so each symbol's snippet is a plain slice
+        instead of re-splitting the whole file per symbol.
+        """
+        offsets = [0]
+        find = content.find
+        pos = find('\n')
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = find('\n', pos + 1)
+        offsets.append(len(content) + 1)
+        return offsets
+
     def get_code_snippet(
         self,
         content: str,
         start_line: int,
-        end_line: int
+        end_line: int,
+        line_offsets: Optional[List[int]] = None,
+        max_chars: Optional[int] = None
     ) -> str:
-        """Extract code snippet for a symbol."""
-        lines = content.split('\n')
+        """
+        Extract code snippet for a symbol.
+
+        max_chars bounds the slice itself, so long symbols are never copied
+        out in full only to be truncated by the caller.
+        """
+        if line_offsets is None:
+            line_offsets = self.get_line_offsets(content)
         start_idx = max(0, start_line - 1)
-        end_idx = min(len(lines), end_line)
-        return '\n'.join(lines[start_idx:end_idx])
+        end_idx = min(len(line_offsets) - 1, end_line)
+        if start_idx >= end_idx:
+            return ""
+        start = line_offsets[start_idx]
+        end = line_offsets[end_idx] - 1
+        if max_chars is not None:
+            end = min(end, start + max_chars)
+        return content[start:end]
 
     async def generate_symbol_summary(
         self,
@@ -512,9 +549,8 @@ class FileProcessor:
         imports = self.extract_imports(content, language)
 
         # Check if underchunked
-        chunk_dicts = [{"symbol_name": s.name} for s in symbols]
-        is_under, under_reason = is_underchunked(
-            relative_path, content, chunk_dicts, language
+        is_under, under_reason = is_underchunked_names(
+            relative_path, content, tuple(s.name for s in symbols), language
         )
 
         # If underchunked, invoke LLM chunker for additional semantic chunks
@@ -550,6 +586,12 @@ class FileProcessor:
         # Generate symbol summaries and create symbol_index docs
         symbol_docs = []
         symbol_summaries = []
+        line_offsets = self.get_line_offsets(content)
+
+        # One timestamp for the file and all of its symbol docs
+        now = datetime.now()
+        pipeline_version = now.strftime("%Y.%m.%d")
+        created_at = now.isoformat()
 
         for symbol in symbols:
             if not symbol.is_significant:
@@ -557,7 +599,8 @@ class FileProcessor:
 
             # Get code snippet for this symbol
             code_snippet = self.get_code_snippet(
-                content, symbol.start_line, symbol.end_line
+                content, symbol.start_line, symbol.end_line, line_offsets,
+                max_chars=MAX_SNIPPET_CHARS,
             )
 
             # Generate summary
@@ -593,8 +636,8 @@ class FileProcessor:
                 ),
                 version=VersionInfo(
                     schema_version=SCHEMA_VERSION,
-                    pipeline_version=datetime.now().strftime("%Y.%m.%d"),
-                    created_at=datetime.now().isoformat(),
+                    pipeline_version=pipeline_version,
+                    created_at=created_at,
                 ),
             )
             # Store code snippet for embedding generation (not persisted)
@@ -633,8 +676,8 @@ class FileProcessor:
             ),
             version=VersionInfo(
                 schema_version=SCHEMA_VERSION,
-                pipeline_version=datetime.now().strftime("%Y.%m.%d"),
-                created_at=datetime.now().isoformat(),
+                pipeline_version=pipeline_version,
+                created_at=created_at,
             ),
         )
         # Store embedding text (summary + code preview, not persisted)
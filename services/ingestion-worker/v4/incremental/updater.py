@@ -156,6 +156,7 @@ class IncrementalUpdater:
         """Process a single repository with incremental update logic."""
         start_time = datetime.now()
         logger.info(f"\nProcessing {repo_id}")
+        self.pipeline.file_processor.clear_symbol_cache()
 
         # 0. Check exclusion list
         if repo_id in self.exclusions:
@@ -353,11 +354,17 @@ class IncrementalUpdater:
             all_docs = file_indices + all_symbol_indices
             if all_docs:
                 if self.pipeline.embedding_generator:
+                    # Get text for embedding, then embed in one batched call
+                    embed_docs = []
+                    embed_texts = []
                     for doc in all_docs:
-                        # Get text for embedding
                         text = getattr(doc, '_embedding_text', None) or getattr(doc, 'content', '')
                         if text:
-                            doc.embedding = self.pipeline.embedding_generator.generate_embedding(text)
+                            embed_docs.append(doc)
+                            embed_texts.append(text)
+                    embeddings = self.pipeline.embedding_generator.generate_text_embeddings(embed_texts)
+                    for doc, embedding in zip(embed_docs, embeddings):
+                        doc.embedding = embedding
 
                 # Upsert new docs first
                 for doc in all_docs:
@@ -434,31 +441,23 @@ class IncrementalUpdater:
     def _regenerate_summaries(self, repo_id: str, commit_hash: str, affected_modules: Set[str], loop=None):
         """Regenerate module_summary and repo_summary."""
         try:
-            # Get all file_indices for this repo
+            # Get all file_indices for this repo. Project only what FileIndex
+            # needs below — SELECT * would ship every 768-d embedding too.
             query = """
-                SELECT META().id, *
-                FROM `code_kosha`
-                WHERE repo_id = $repo_id
-                  AND type = 'file_index'
+                SELECT d.document_id, d.repo_id, d.file_path, d.content,
+                       d.metadata, d.language, d.line_count, d.imports
+                FROM `code_kosha` d
+                WHERE d.repo_id = $repo_id
+                  AND d.type = 'file_index'
             """
             result = self.cb_client.cluster.query(query, repo_id=repo_id)
-            file_indices = list(result)
-
-            if not file_indices:
-                return
-
-            # For dry-run: show comparison
-            old_repo_summary = None
-            if self.dry_run:
-                old_repo_summary = self.repo_lifecycle.get_old_repo_summary(repo_id)
 
-            # Convert to schema objects
+            # Convert to schema objects, streaming rows rather than holding the
+            # raw result set in memory alongside them
             from v4.schemas import FileIndex, make_file_id
             file_index_objects = []
-            for row in file_indices:
-                # SELECT * nests fields under bucket name 'code_kosha'
-                doc = row.get('code_kosha', row)
-                metadata = doc.get('metadata', {})
+            for doc in result:
+                metadata = doc.get('metadata') or {}
                 fi = FileIndex(
                     document_id=doc.get('document_id') or make_file_id(
                         doc.get('repo_id'), doc.get('file_path'), commit_hash
@@ -473,6 +472,14 @@ class IncrementalUpdater:
                 )
                 file_index_objects.append(fi)
 
+            if not file_index_objects:
+                return
+
+            # For dry-run: show comparison
+            old_repo_summary = None
+            if self.dry_run:
+                old_repo_summary = self.repo_lifecycle.get_old_repo_summary(repo_id)
+
             # Load prior LLM module summaries so unaffected modules keep their
             # good summary instead of being overwritten with the fallback when
             # they aren't LLM-regenerated this run (see aggregate_module_summary).
@@ -531,10 +538,12 @@ class IncrementalUpdater:
             # Generate embeddings and store
             all_summaries = module_summaries + [repo_summary]
             if self.pipeline.embedding_generator:
-                for summary in all_summaries:
-                    text = getattr(summary, 'content', '')
-                    if text:
-                        summary.embedding = self.pipeline.embedding_generator.generate_embedding(text)
+                embed_summaries = [s for s in all_summaries if getattr(s, 'content', '')]
+                embeddings = self.pipeline.embedding_generator.generate_text_embeddings(
+                    [s.content for s in embed_summaries]
+                )
+                for summary, embedding in zip(embed_summaries, embeddings):
+                    summary.embedding = embedding
 
             for summary in all_summaries:
                 doc = summary.to_dict()
@@ -18,7 +18,9 @@ from loguru import logger
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from llm_enricher import LLMEnricher as BaseLLMEnricher, LLMConfig, LLM_CONFIG
+from llm_enricher import (
+    LLMEnricher as BaseLLMEnricher, LLMConfig, LLM_CONFIG, _symbol_cache_text, _trivial_enrichment
+)
 
 
 class V4LLMEnricher:
@@ -29,8 +31,14 @@ class V4LLMEnricher:
     compatible with V4 pipeline expectations.
     """
 
-    def __init__(self, config: LLMConfig = LLM_CONFIG):
-        self.base_enricher = BaseLLMEnricher(config)
+    def __init__(self, config: LLMConfig = LLM_CONFIG, embedder=None):
+        """
+        Args:
+            config: LLM provider configuration
+            embedder: Object with generate_embedding(text) -> List[float];
+                keys the semantic cache (config.semantic_cache_enabled)
+        """
+        self.base_enricher = BaseLLMEnricher(config, embedder)
         self._token_estimate_ratio = 0.25  # ~4 chars per token
 
     def _estimate_tokens(self, text: str) -> int:
@@ -58,6 +66,19 @@ class V4LLMEnricher:
         Returns:
             Dict with 'summary' and 'tokens' keys
         """
+        # Short symbols go to the small model when one is configured
+        enricher = self.base_enricher.for_code(code)
+
+        # Near-duplicates of already summarized code don't need the LLM
+        cached, embedding = await enricher._semantic_lookup(
+            "symbol_summary", _symbol_cache_text(symbol_name, symbol_type, file_path, code[:4000])
+        )
+        if cached is not None:
+            return {
+                "summary": cached["summary"],
+                "tokens": 0
+            }
+
         prompt = f"""Analyze this {language} {symbol_type} and provide a concise summary.
 
 File: {file_path}
@@ -75,10 +96,13 @@ Write a 1-3 sentence summary explaining:
 Be concise and focus on practical usage. Do not repeat the code."""
 
         try:
-            response = await self.base_enricher.generate(prompt)
+            response = await enricher.generate(prompt)
             tokens = self._estimate_tokens(prompt + response)
+            summary = response.strip()
+            if summary:
+                enricher._semantic_store("symbol_summary", embedding, {"summary": summary})
             return {
-                "summary": response.strip(),
+                "summary": summary,
                 "tokens": tokens
             }
         except Exception as e:
@@ -104,6 +128,25 @@ Be concise and focus on practical usage. Do not repeat the code."""
         Returns:
             Dict with 'summary' and 'tokens' keys
         """
+        # Near-empty and import-only files are described without the LLM
+        trivial = _trivial_enrichment(file_path, content, language)
+        if trivial is not None:
+            self.base_enricher.trivial_skipped += 1
+            logger.debug(f"Skipping LLM for trivial file {file_path}")
+            return {
+                "summary": trivial.summary,
+                "tokens": 0
+            }
+
+        cached, embedding = await self.base_enricher._semantic_lookup(
+            "file_summary", f"File: {file_path}\n{content[:5000]}"
+        )
+        if cached is not None:
+            return {
+                "summary": cached["summary"],
+                "tokens": 0
+            }
+
         # Build prompt based on available context
         if symbols_context:
             prompt = f"""Summarize this {language} file based on its symbols and content.
@@ -143,8 +186,11 @@ Be concise and practical."""
         try:
             response = await self.base_enricher.generate(prompt)
             tokens = self._estimate_tokens(prompt + response)
+            summary = response.strip()
+            if summary:
+                self.base_enricher._semantic_store("file_summary", embedding, {"summary": summary})
             return {
-                "summary": response.strip(),
+                "summary": summary,
                 "tokens": tokens
             }
         except Exception as e:
@@ -76,8 +76,15 @@ class V4Pipeline:
         self.code_parser = CodeParser()
         self.quality_tracker = QualityTracker()
 
+        if enable_embeddings:
+            self.embedding_generator = LocalEmbeddingGenerator()
+        else:
+            self.embedding_generator = None
+
         if enable_llm:
-            self.llm_enricher = V4LLMEnricher(llm_config)
+            # One embedding model serves the vector store and the semantic
+            # enrichment cache (llm_config.semantic_cache_enabled)
+            self.llm_enricher = V4LLMEnricher(llm_config, embedder=self.embedding_generator)
         else:
             self.llm_enricher = None
 
@@ -94,11 +101,6 @@ class V4Pipeline:
             enable_llm=enable_llm,
         )
 
-        if enable_embeddings:
-            self.embedding_generator = LocalEmbeddingGenerator()
-        else:
-            self.embedding_generator = None
-
         if not dry_run:
             self.storage = CouchbaseClient()
         else:
@@ -283,10 +285,12 @@ class V4Pipeline:
             batch_texts = texts[i:i + batch_size]
             batch_docs = docs[i:i + batch_size]
 
-            # Generate embeddings
-            for j, text in enumerate(batch_texts):
-                embedding = self.embedding_generator.generate_embedding(text)
-                batch_docs[j].embedding = embedding
+            # Generate embeddings (one batched forward pass per batch)
+            embeddings = self.embedding_generator.generate_text_embeddings(
+                batch_texts, batch_size=batch_size
+            )
+            for doc, embedding in zip(batch_docs, embeddings):
+                doc.embedding = embedding
                 self.quality_tracker.record_embedding()
 
             # Log progress
@@ -381,28 +385,25 @@ class V4Pipeline:
             return 0
 
         try:
-            # Count existing documents
-            count_query = f"""
-                SELECT COUNT(*) as count
-                FROM `{config.couchbase_bucket}`
-                WHERE repo_id = $repo_id
-            """
-            result = self.storage.cluster.query(count_query, repo_id=repo_id)
-            rows = list(result)
-            count = rows[0]['count'] if rows else 0
+            from couchbase.options import QueryOptions
 
-            if count == 0:
-                return 0
+            # Prepared (adhoc=False) so `--all` runs reuse one plan per statement
+            options = QueryOptions(named_parameters={"repo_id": repo_id}, adhoc=False)
 
-            # Delete all documents for this repo
+            # Single server-side DELETE; RETURNING gives the count without a
+            # separate COUNT(*) round-trip
             delete_query = f"""
                 DELETE FROM `{config.couchbase_bucket}`
                 WHERE repo_id = $repo_id
+                RETURNING META().id
             """
             # N1QL executes lazily — the result MUST be consumed or the DELETE
             # never reaches the server (same pitfall fixed in the incremental
             # summary path). Otherwise delete_existing=True silently no-ops.
-            _ = list(self.storage.cluster.query(delete_query, repo_id=repo_id))
+            count = sum(1 for _ in self.storage.cluster.query(delete_query, options))
+
+            if count == 0:
+                return 0
 
             logger.info(f"Deleted {count} V3 documents for {repo_id}")
             return count
@@ -432,6 +433,7 @@ class V4Pipeline:
         """
         logger.info(f"Starting V4 ingestion for {repo_id}")
         self.quality_tracker.start_run(repo_id)
+        self.file_processor.clear_symbol_cache()
 
         # Get commit hash
         commit_hash = self.get_current_commit(repo_path)
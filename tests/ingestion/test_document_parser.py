@@ -0,0 +1,111 @@
+"""
+DocumentParser unit tests (no database or git repository needed)
+"""
+
+import gc
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "services" / "ingestion-worker"))
+
+from parsers import document_parser
+from parsers.document_parser import DocumentParser, _parse_json
+
+
+def test_parse_json_keeps_integers_beyond_64_bits():
+    """Large integer literals must survive re-serialization exactly"""
+    content = '{"id":123456789012345678901234567890,"n":-98765432109876543210}'
+
+    data, formatted = _parse_json(content)
+
+    assert data["id"] == 123456789012345678901234567890
+    assert data["n"] == -98765432109876543210
+    assert '"id": 123456789012345678901234567890' in formatted
+    assert json.loads(formatted) == data
+
+
+def test_parse_json_pretty_prints_minified_input():
+    data, formatted = _parse_json('{"a":[1,2],"b":"é"}')
+
+    assert data == {"a": [1, 2], "b": "é"}
+    assert formatted.startswith('{\n  "a": [')
+    assert json.loads(formatted) == data
+
+
+@pytest.mark.parametrize("content", [
+    '{\n  "a": 1,\n  "b": [1, 2]\n}\n',
+    '{\n    "a": 1,\n    "b": [\n        1\n    ]\n}\n',
+    '{\n\t"a": 1,\n\t"b": {"c": 2}\n}\n',
+])
+def test_parse_json_keeps_indented_files_as_is(content):
+    data, formatted = _parse_json(content)
+
+    assert formatted == content
+    assert data == json.loads(content)
+
+
+def test_parse_json_reformats_unindented_multiline_input():
+    content = '{\n"a": 1,\n"b": [1, 2]\n}'
+
+    _, formatted = _parse_json(content)
+
+    assert formatted == '{\n  "a": 1,\n  "b": [\n    1,\n    2\n  ]\n}'
+
+
+@pytest.mark.parametrize("content", [
+    '{"name":"café","tags":["✓","中文"],"ctrl":"a\\u0000b"}',
+    '{"small":0.00001,"tiny":1e-7,"big":1e100,"neg":-0.0,"x":0.1}',
+    '[{"a":{}},{"b":[]},null,true,12345678901234567890123]',
+])
+def test_parse_json_output_is_the_same_with_and_without_orjson(monkeypatch, content):
+    pytest.importorskip("orjson")
+    with_orjson = _parse_json(content)
+
+    monkeypatch.setattr(document_parser, "HAS_ORJSON", False)
+    without_orjson = _parse_json(content)
+
+    assert with_orjson == without_orjson
+
+
+def _git_repo(path: Path) -> Path:
+    (path / "README.md").write_text("# Title\n")
+    for args in (
+        ["init", "-q"],
+        ["add", "README.md"],
+        ["-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "init"],
+    ):
+        subprocess.run(["git", *args], cwd=path, check=True)
+    return path
+
+
+def test_document_parser_context_manager_releases_repos(tmp_path):
+    repo_path = _git_repo(tmp_path)
+
+    with DocumentParser() as parser:
+        metadata = parser.get_git_metadata(repo_path, "README.md")
+        repo = parser._repo_cache[repo_path]
+        repo.head.commit.tree["README.md"].data_stream.read()
+        assert repo.git.cat_file_all is not None
+
+    assert metadata["author"] == "t@example.com"
+    assert parser._repo_cache == {}
+    assert repo.git.cat_file_all is None
+
+
+def test_document_parser_releases_repos_when_collected(tmp_path):
+    repo_path = _git_repo(tmp_path)
+    parser = DocumentParser()
+    parser.get_git_metadata(repo_path, "README.md")
+    repo = parser._repo_cache[repo_path]
+    # Open the cat-file process that close() has to stop
+    repo.head.commit.tree["README.md"].data_stream.read()
+    assert repo.git.cat_file_all is not None
+
+    del parser
+    gc.collect()
+
+    assert repo.git.cat_file_all is None
@@ -0,0 +1,95 @@
+"""
+PromptCache / SemanticCache unit tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "services" / "ingestion-worker"))
+
+from llm_cache import (
+    PromptCache, SemanticCache, _COMPRESS_MIN_BYTES, _ZLIB_MARKER, _dumps, _loads
+)
+
+
+def test_payload_round_trip_plain_and_compressed():
+    small = {"summary": "short", "n": [1, 2, 3]}
+    large = {"summary": "x" * (2 * _COMPRESS_MIN_BYTES), "unicode": "é → ✓"}
+
+    small_payload = _dumps(small)
+    large_payload = _dumps(large)
+
+    assert not small_payload.startswith(_ZLIB_MARKER)
+    assert large_payload.startswith(_ZLIB_MARKER)
+    assert len(large_payload) < _COMPRESS_MIN_BYTES
+    assert _loads(small_payload) == small
+    assert _loads(large_payload) == large
+
+
+def test_prompt_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    key = PromptCache.make_key("model", "prompt")
+    large = "y" * (2 * _COMPRESS_MIN_BYTES)
+
+    cache = PromptCache(path=path)
+    cache.put(key, {"raw": "answer"})
+    cache.put("large", large)
+    cache.close()
+
+    reopened = PromptCache(path=path)
+    try:
+        assert len(reopened) == 0  # served from SQLite, not memory
+        assert reopened.get(key) == {"raw": "answer"}
+        assert reopened.get("large") == large
+        assert reopened.get("missing") is None
+        assert (reopened.hits, reopened.misses) == (2, 1)
+    finally:
+        reopened.close()
+
+
+def test_prompt_cache_make_key_separates_parts():
+    assert PromptCache.make_key("ab", "c") != PromptCache.make_key("a", "bc")
+    assert PromptCache.make_key("a", "b") == PromptCache.make_key("a", "b")
+
+
+def test_prompt_cache_evicts_least_recently_used():
+    cache = PromptCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_semantic_cache_matches_by_threshold():
+    cache = SemanticCache(threshold=0.95)
+    cache.put([1.0, 0.0, 0.0], {"summary": "first"})
+
+    assert cache.get([2.0, 0.1, 0.0]) == {"summary": "first"}  # cosine ~0.999
+    assert cache.get([1.0, 1.0, 0.0]) is None  # cosine ~0.71
+    assert cache.get([0.0, 0.0, 0.0]) is None  # failed embeddings never match
+    assert cache.get([1.0, 0.0]) is None  # other dimension
+
+
+def test_semantic_cache_namespaces_are_isolated(tmp_path):
+    path = str(tmp_path / "cache.db")
+    vector = [0.6, 0.8]
+
+    files = SemanticCache(path=path, namespace="model/file")
+    files.put(vector, {"summary": "file"})
+    files.close()
+
+    symbols = SemanticCache(path=path, namespace="model/symbol")
+    reopened = SemanticCache(path=path, namespace="model/file")
+    try:
+        assert symbols.get(vector) is None
+        assert len(symbols) == 0
+        assert reopened.get(vector) == {"summary": "file"}
+    finally:
+        symbols.close()
+        reopened.close()
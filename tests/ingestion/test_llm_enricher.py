@@ -0,0 +1,257 @@
+"""
+LLMEnricher unit tests (no LLM server needed)
+"""
+
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "services" / "ingestion-worker"))
+
+from llm_enricher import (
+    LLMConfig, LLMEnricher, LLMUnavailableError, _balanced_from, _extract_first_json,
+    _trivial_enrichment
+)
+
+
+def _config(**overrides) -> LLMConfig:
+    return LLMConfig(
+        provider="lmstudio", model="test", base_url="http://localhost:1", cache_enabled=False, **overrides
+    )
+
+
+def _enrichment_json(summary: str) -> str:
+    return json.dumps({
+        "summary": summary, "purpose": "", "key_symbols": [],
+        "usage_pattern": None, "integrations": [], "quality_notes": None,
+    })
+
+
+class _StubEmbedder:
+    """Embeds each text to the vector registered for a marker it contains."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def generate_embedding(self, text):
+        return next(vector for marker, vector in self.vectors.items() if marker in text)
+
+
+def test_trivial_enrichment_skips_near_empty_files():
+    content = '"""Package marker."""\n# nothing here\n'
+
+    result = _trivial_enrichment("pkg/marker.py", content, "python")
+
+    assert result is not None
+    assert result.summary.startswith("Trivial python file")
+
+
+def test_trivial_enrichment_describes_reexporting_init():
+    content = (
+        '"""Public API."""\n'
+        "from .client import Client, AsyncClient\n"
+        "from .errors import (\n    ClientError,\n    TimeoutError,\n)\n"
+        "import pkg.version\n"
+    )
+
+    result = _trivial_enrichment("pkg/__init__.py", content, "python")
+
+    assert result is not None
+    assert result.purpose == "Module init"
+    assert "pkg" in result.summary
+    assert result.integrations == [".client", ".errors", "pkg.version"]
+
+
+def test_trivial_enrichment_leaves_real_code_to_the_llm():
+    content = (
+        "from .client import Client\n\n"
+        "def connect(url):\n"
+        "    client = Client(url)\n"
+        "    client.open()\n"
+        "    return client\n"
+    )
+
+    assert _trivial_enrichment("pkg/__init__.py", content, "python") is None
+
+
+def _semantic_enricher(vectors):
+    enricher = LLMEnricher(
+        _config(semantic_cache_enabled=True, semantic_threshold=0.95), _StubEmbedder(vectors)
+    )
+    prompts = []
+
+    async def generate(prompt, **kwargs):
+        prompts.append(prompt)
+        return _enrichment_json(f"summary {len(prompts)}")
+
+    enricher.generate = generate
+    return enricher, prompts
+
+
+def test_semantic_cache_hit_above_threshold():
+    # cosine(original, near) ~ 0.995
+    enricher, prompts = _semantic_enricher({"original": [1.0, 0.0], "near": [1.0, 0.1]})
+
+    async def run():
+        first = await enricher.enrich_symbol("original", "function", "def f(): pass", "a.py")
+        second = await enricher.enrich_symbol("near", "function", "def f():  pass", "a.py")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert len(prompts) == 1
+    assert second.summary == first.summary == "summary 1"
+
+
+def test_semantic_cache_miss_below_threshold():
+    # cosine(original, far) ~ 0.89
+    enricher, prompts = _semantic_enricher({"original": [1.0, 0.0], "far": [1.0, 0.5]})
+
+    async def run():
+        await enricher.enrich_symbol("original", "function", "def f(): pass", "a.py")
+        return await enricher.enrich_symbol("far", "function", "def g(): return 1", "a.py")
+
+    second = asyncio.run(run())
+
+    assert len(prompts) == 2
+    assert second.summary == "summary 2"
+
+
+def test_semantic_cache_keeps_files_and_symbols_apart():
+    enricher, prompts = _semantic_enricher({"same": [1.0, 0.0]})
+    content = "def same(values):\n    total = sum(values)\n    return compute_something_expensive(total)\n"
+
+    async def run():
+        await enricher.enrich_symbol("same", "function", content, "same.py")
+        return await enricher.enrich_file("same.py", content)
+
+    asyncio.run(run())
+
+    assert len(prompts) == 2
+
+
+def test_extract_first_json_skips_surrounding_prose():
+    text = 'Here you go: {"a": {"b": [1, {"c": 2}]}} Hope that {helps}.'
+
+    assert _extract_first_json(text) == '{"a": {"b": [1, {"c": 2}]}}'
+
+
+def test_extract_first_json_ignores_braces_inside_strings():
+    text = '{"code": "if (x) { return \\"}\\"; }", "n": 1} trailing }'
+
+    extracted = _extract_first_json(text)
+
+    assert json.loads(extracted) == {"code": 'if (x) { return "}"; }', "n": 1}
+
+
+def test_extract_first_json_handles_escaped_backslash_before_quote():
+    # The string ends at the quote after "\\"; the brace after it is structural
+    text = '{"path": "C:\\\\", "x": {}}'
+
+    assert json.loads(_extract_first_json(text)) == {"path": "C:\\", "x": {}}
+
+
+def test_extract_first_json_moves_past_unparseable_candidates():
+    text = '{not json} then {"ok": true}'
+
+    assert _extract_first_json(text) == '{"ok": true}'
+
+
+def test_extract_first_json_arrays_and_missing_values():
+    assert _extract_first_json('items: [1, [2, "]"], 3] done', "[") == '[1, [2, "]"], 3]'
+    assert _extract_first_json('{"summary": "cut off') is None
+    assert _extract_first_json("no json here") is None
+
+
+def test_balanced_from_returns_none_when_unbalanced():
+    assert _balanced_from('{"a": {"b": 1}', 0, "{", "}") is None
+    assert _balanced_from('x {"a": 1} y', 2, "{", "}") == '{"a": 1}'
+
+
+def _open_breaker(enricher: LLMEnricher) -> None:
+    for _ in range(enricher._max_consecutive_failures):
+        enricher._record_failure()
+
+
+def _expire_cooldown(enricher: LLMEnricher) -> None:
+    enricher._opened_at -= enricher._cooldown_seconds
+
+
+def test_circuit_breaker_rejects_calls_while_open():
+    enricher = LLMEnricher(_config())
+    _open_breaker(enricher)
+
+    assert enricher._circuit_open()
+    with pytest.raises(LLMUnavailableError):
+        enricher._enter_circuit()
+
+
+def test_circuit_breaker_lets_one_probe_through_after_cooldown():
+    enricher = LLMEnricher(_config())
+    _open_breaker(enricher)
+    _expire_cooldown(enricher)
+
+    assert enricher._enter_circuit() is True
+    # Other calls are rejected while the probe is in flight
+    with pytest.raises(LLMUnavailableError):
+        enricher._enter_circuit()
+
+
+def _probing_enricher(call):
+    enricher = LLMEnricher(_config(max_retries=3))
+    calls = []
+
+    async def call_responses(*args):
+        calls.append(args)
+        return call()
+
+    enricher._call_responses = call_responses
+    _open_breaker(enricher)
+    _expire_cooldown(enricher)
+    return enricher, calls
+
+
+def test_circuit_breaker_closes_after_successful_probe():
+    enricher, calls = _probing_enricher(lambda: "ok")
+
+    assert asyncio.run(enricher.generate("prompt")) == "ok"
+
+    assert len(calls) == 1
+    assert enricher._opened_at is None
+    assert enricher._consecutive_failures == 0
+    assert not enricher._probe_in_flight
+    assert enricher._enter_circuit() is False
+
+
+def test_circuit_breaker_reopens_after_failed_probe():
+    def fail():
+        raise RuntimeError("still down")
+
+    enricher, calls = _probing_enricher(fail)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(enricher.generate("prompt"))
+
+    # The probe gets a single attempt, then the cooldown restarts
+    assert len(calls) == 1
+    assert enricher._circuit_open()
+    assert not enricher._probe_in_flight
+    with pytest.raises(LLMUnavailableError):
+        enricher._enter_circuit()
+
+
+@pytest.mark.parametrize("jitter, factor", [(0.0, 0.5), (0.5, 1.0), (0.999, 1.499)])
+def test_backoff_delay_doubles_up_to_max_delay(monkeypatch, jitter, factor):
+    enricher = LLMEnricher(_config(base_delay=0.5, max_delay=30.0))
+    monkeypatch.setattr(random, "random", lambda: jitter)
+
+    delays = [enricher._backoff_delay(attempt) for attempt in range(10)]
+
+    expected = [min(30.0, 0.5 * 2 ** attempt) * factor for attempt in range(10)]
+    assert delays == pytest.approx(expected)
+    # Attempt 6 would be 32s uncapped
+    assert delays[6:] == pytest.approx([30.0 * factor] * 4)